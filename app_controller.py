@@ -1,9 +1,21 @@
 import sys
-from PyQt5 import QtWidgets
-from PyQt5.QtWidgets import QApplication
 
-from app_model import Model
-from app_view import MainWindow
+# imported first, so the imports below are on the startup timeline
+import profiler
+
+with profiler.phase("import PyQt5"):
+    from PyQt5 import QtWidgets
+    from PyQt5.QtCore import Qt, QThreadPool, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+with profiler.phase("import app_model"):
+    from app_model import Model
+# the generated UI imports it too, registering the icons is timed here
+with profiler.phase("register resources_rc"):
+    import resources_rc
+with profiler.phase("import app_view"):
+    from app_view import MainWindow, import_canvas
+from worker import Worker
 
 
 class Controller:
@@ -21,6 +33,17 @@ class Controller:
         The Model object that contains the data.
     _view: app_view.MainWindow
         The MainWindow object that contains the GUI.
+    _pool: PyQt5.QtCore.QThreadPool
+        The thread pool that runs the Model queries off the GUI thread.
+    _pending: int
+        The number of queries still running in the background.
+    _sweep_timer: PyQt5.QtCore.QTimer
+        The timer that refreshes the traffic messages of every type.
+    _sweeping: bool
+        True while the traffic messages refresh is running.
+    _prewarm: bool
+        True if the plot canvases are prepared in the background once the
+        window is shown, instead of on the first plot.
 
     Methods
     -------
@@ -30,51 +53,197 @@ class Controller:
     submit_conditions()
         On road conditions submit-button-press the user input is taken,
         the data is parsed from the API, and the result is shown as widgets.
+    select_conditions_hour()
+        On forecast hour change the shown road conditions are updated, from
+        memory if the Model still has them.
     submit_messages()
         On traffic messages submit-button-press the user input is taken,
         the data is parsed from the API, and the result is shown as table.
+    select_messages_type()
+        On situation type change the shown traffic messages are updated,
+        from memory if the Model still has them.
+    sweep_messages()
+        Refreshes the traffic messages of every situation type in the
+        background.
     submit_combined()
         On combined reports submit-button-press the user input is taken,
         the data is parsed from the APIs, and the result is shown as a
         combination of different results.
     """
 
-    def __init__(self):
-        self._app = QtWidgets.QApplication(sys.argv)
+    def __init__(self, prewarm=True):
+        with profiler.phase("create QApplication"):
+            self._app = QtWidgets.QApplication(sys.argv)
 
         # external style sheet
-        with open("assets/style.css","r") as f:
-            self._app.setStyleSheet(f.read())
+        with profiler.phase("parse style.css"):
+            with open("assets/style.css","r") as f:
+                self._app.setStyleSheet(f.read())
+
+        with profiler.phase("create Model"):
+            self._model = Model()
+        with profiler.phase("create MainWindow"):
+            self._view = MainWindow(self)
+            self._view.setup_locations(self._model.coordinates.names())
+
+        # background threads for the blocking Model queries
+        self._pool = QThreadPool.globalInstance()
+        self._pending = 0
 
-        self._model = Model()
-        self._view = MainWindow(self)
+        # all the traffic message types are kept fresh in the background
+        self._sweeping = False
+        self._sweep_timer = QTimer()
+        self._sweep_timer.timeout.connect(self.sweep_messages)
+
+        self._prewarm = prewarm
 
 
     def submit_tasks(self):
-        self._model.get_tasks_data(self._view.get_tasks_input())
-        self._view.update_tasks_widget(self._model.tasks_per_day)
+        self._start(self._model.get_tasks_data,
+                    self._view.get_tasks_input(),
+                    lambda: self._view.update_tasks_widget(
+                        self._model.tasks_histogram))
 
 
     def submit_conditions(self):
-        self._model.get_conditions_data(self._view.get_conditions_input())
-        self._view.update_conditions_widget(self._model.conditions_data)
+        self._start(self._model.get_conditions_data,
+                    self._view.get_conditions_input(),
+                    lambda: self._view.update_conditions_widget(
+                        self._model.conditions_data))
+
+
+    def select_conditions_hour(self):
+        inputs = self._view.get_conditions_input()
+        # no network needed, so no need for the background thread either
+        if self._model.has_conditions_data(inputs):
+            self._model.get_conditions_data(inputs)
+            self._view.update_conditions_widget(self._model.conditions_data)
+        else:
+            self.submit_conditions()
 
 
     def submit_messages(self):
-        self._model.get_messages_data(self._view.get_messages_input())
-        self._view.update_messages_widget(self._model.messages_data)
+        self._start(self._model.get_messages_data,
+                    self._view.get_messages_input(),
+                    lambda: self._view.update_messages_widget(
+                        self._model.messages_data))
+
+
+    def select_messages_type(self):
+        inputs = self._view.get_messages_input()
+        # no network needed, so no need for the background thread either
+        if self._model.has_messages_data(inputs):
+            self._model.get_messages_data(inputs)
+            self._view.update_messages_widget(self._model.messages_data)
+        else:
+            self.submit_messages()
+
+
+    def sweep_messages(self):
+        if self._sweeping:
+            return
+        self._sweeping = True
+
+        # not a user query, so no busy state and no error dialogs
+        worker = Worker(self._model.sweep_messages,
+                        self._view.get_message_types())
+        worker.signals.result.connect(self._sweep_done, Qt.QueuedConnection)
+        worker.signals.finished.connect(self._sweep_finished,
+                                        Qt.QueuedConnection)
+        self._pool.start(worker)
+
+
+    def _sweep_done(self, errors):
+        # the failed types keep their previous tables
+        self._view.show_sweep_errors(errors)
+        # a running query sets the messages it shows, the sweep keeps out
+        if self._pending or not self._view.messages_shown():
+            return
+        # the rows on screen are patched if they are the table the sync
+        # started from, otherwise the refreshed messages are shown again
+        # from the store, the sweep never queries the network itself
+        inputs = self._view.get_messages_input()
+        changes = self._model.message_changes.get(inputs["type"])
+        if changes is not None and changes.base is not None \
+                and changes.base is self._model.messages_data:
+            self._model.messages_data = changes.table
+            if changes:
+                self._view.update_messages_rows(changes)
+        elif self._model.has_messages_data(inputs):
+            self._model.get_messages_data(inputs)
+            self._view.update_messages_widget(self._model.messages_data)
+
+
+    def _sweep_finished(self):
+        self._sweeping = False
 
 
     def submit_combined(self):
-        self._model.get_combined_data(self._view.get_combined_input())
-        self._view.update_combined_widget(self._model.tasks_per_day,
-                                          self._model.conditions_data,
-                                          self._model.messages_data,
-                                          self._model.weather_data)
+        self._start(self._model.get_combined_data,
+                    self._view.get_combined_input(),
+                    lambda: self._view.update_combined_widget(
+                        self._model.tasks_histogram,
+                        self._model.conditions_data,
+                        self._model.messages_data,
+                        self._model.weather_data))
+
+
+    def _start(self, query, inputs, update):
+        # inputs are read here in the GUI thread, only the query runs in the pool
+        worker = Worker(query, inputs)
+        worker.signals.result.connect(lambda _: update(), Qt.QueuedConnection)
+        worker.signals.error.connect(self._view.show_error, Qt.QueuedConnection)
+        worker.signals.finished.connect(self._finish, Qt.QueuedConnection)
+
+        self._pending += 1
+        self._view.set_busy(True)
+        self._pool.start(worker)
+
+
+    def _finish(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self._view.set_busy(False)
+
+
+    def _prewarm_canvas(self):
+        # matplotlib is imported in the pool, the widgets are then created
+        # in the GUI thread, before the user asks for the first plot
+        worker = Worker(import_canvas)
+        worker.signals.result.connect(lambda _: self._view.setup_canvas(),
+                                      Qt.QueuedConnection)
+        worker.signals.finished.connect(self._startup_done,
+                                        Qt.QueuedConnection)
+        self._pool.start(worker)
+
+
+    def _first_paint(self):
+        profiler.mark("first paint")
+        if self._prewarm:
+            self._prewarm_canvas()
+        else:
+            self._startup_done()
+
+
+    def _startup_done(self):
+        if not profiler.enabled:
+            return
+        profiler.mark("startup done")
+        # stderr, so the path does not mix with any output of the app
+        print("startup profile:", profiler.write(), file=sys.stderr)
+        if profiler.exit_after:
+            self._app.quit()
 
 
     def run(self):
-        self._view.show()
+        with profiler.phase("show MainWindow"):
+            self._view.show()
+        # a zero timer fires once the events of the first paint are done
+        QTimer.singleShot(0, self._first_paint)
+        # a profiling run that quits after startup does not touch the network
+        if not (profiler.enabled and profiler.exit_after):
+            QTimer.singleShot(0, self.sweep_messages)
+            self._sweep_timer.start(int(self._model.messages_refresh * 1000))
         return self._app.exec_()
 
 
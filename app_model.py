@@ -1,7 +1,69 @@
-import requests
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
-import xml.etree.ElementTree as ET
+
+import decoder
+import wfs
+from cache import ResponseCache
+from conditions import NUMERIC_FIELDS, ConditionsSnapshot
+from disk_cache import DiskCache
+from extract import compile_extractor
+from histogram import TaskHistogram
+from json_stream import iter_features
+from locations import LocationRegistry
+from messages import ChangeSet, MessageStore, MessageTable
+from spatial import geometry_bbox, intersects, union
+import tiles
+from transport import Transport
+
+
+# UTC datetime format of the API query parameters
+UTC_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# format of the tasks chunks on disk, bumped when the stored results change
+TASKS_CACHE_VERSION = 3
+
+# tracking data reaches the API late, so a cell is final only this long after
+# its window has ended
+TASKS_GRACE = timedelta(hours=6)
+
+# workers of the pools of the sources, of the chunks of one source and of the
+# messages sweep, every worker may hold a connection to the same host
+SOURCE_WORKERS = 4
+CHUNK_WORKERS = 4
+SWEEP_WORKERS = 4
+
+# width and height in degrees of the grid tiles the bboxes are fetched in
+TILE_SIZE = 1
+
+# paths of the traffic messages table columns in a message feature
+MESSAGE_FIELDS = {
+    "countryCode": ("properties", "announcements", 0, "location",
+                    "countryCode"),
+    "municipality": ("properties", "announcements", 0, "locationDetails",
+                     "roadAddressLocation", "primaryPoint", "municipality"),
+    "road": ("properties", "announcements", 0, "locationDetails",
+             "roadAddressLocation", "primaryPoint", "roadAddress", "road"),
+    "description": ("properties", "announcements", 0, "location",
+                    "description"),
+}
+extract_message = compile_extractor(MESSAGE_FIELDS)
+
+
+def area_codes(feature):
+    """
+    Returns the location codes of the areas a message is located by.
+    """
+    codes = []
+    properties = feature.get('properties') or {}
+    for announcement in properties.get('announcements') or ():
+        details = announcement.get('locationDetails') or {}
+        for area in (details.get('areaLocation') or {}).get('areas') or ():
+            if area.get('locationCode') is not None:
+                codes.append(area['locationCode'])
+    return codes
 
 
 class Model:
@@ -14,13 +76,48 @@ class Model:
     Attributes
     ----------
     tasks_per_day: dict
-        The dict of road maintainance data as a histogram of tasks per day.
+        The dict of road maintainance data as the total of every task.
+    tasks_histogram: histogram.TaskHistogram
+        The road maintainance data as a task x day histogram.
     conditions_data: dict
-        The dict of road conditions data.
-    messages_data: list
-        The list of dicts of trafic messages data.
-    coordinates: dict
-        The dict of tuples of hardcoded locations.
+        The dict of road conditions data as the mean over the stations.
+    conditions_stats: dict
+        The dict of min/mean/max road conditions over the stations.
+    conditions_snapshots: dict
+        The dict of road conditions of every forecast hour per bbox.
+    messages_data: messages.MessageTable
+        The columnar table of trafic messages data.
+    message_store: messages.MessageStore
+        The tables of trafic messages of every situation type fetched so far.
+    messages_refresh: float
+        The interval in seconds of the refresh of the stored messages.
+    messages_max_age: float
+        The age in seconds after which the stored messages are fetched again.
+    message_changes: dict
+        The messages.ChangeSet of the last sync of every situation type.
+    area_bboxes: dict
+        The bbox of every area location code fetched so far, None for an area
+        without a geometry.
+    weather_data: dict
+        The dict of weather data as the mean of every parameter.
+    weather_series: dict
+        The dict of time series of every parameter per weather station.
+    weather_stats: dict
+        The dict of min/mean/max/latest of every parameter over all stations.
+    coordinates: locations.LocationRegistry
+        The registry of the locations and their bboxes from the data file.
+    transport: transport.Transport
+        The pooled HTTP transport shared by all the API requests.
+    errors: dict
+        The dict of error messages of the sources that failed in the last
+        combined report.
+    sweep_errors: dict
+        The dict of error messages of the situation types that failed in the
+        last traffic messages sweep.
+    cache: cache.ResponseCache
+        The in-memory cache of the API responses.
+    disk_cache: disk_cache.DiskCache
+        The persistent cache of the tasks of closed historical windows.
 
     Methods
     -------
@@ -30,51 +127,170 @@ class Model:
     get_conditions_data(inputs)
         Gets the road conditions data from the Digitraffic API and parses it
         according to the user inputs.
+    has_conditions_data(inputs)
+        Returns True if the road conditions are answered from memory.
     get_messages_data(type)
         Gets the traffic messages data from the Digitraffic API and parses it
         according to the user inputs.
+    has_messages_data(inputs)
+        Returns True if the traffic messages are answered from memory.
+    sweep_messages(types)
+        Syncs the traffic messages of all the situation types concurrently.
     get_weather_data(type)
         Gets the weather data from the FMI API and parses it according to the
         user inputs.
     get_combined_data(type)
-        Calls all other methods for combined reports.
+        Calls all other methods concurrently for combined reports.
     """
 
     def __init__(self):
         self.tasks_per_day = {}
-        self.messages_data = []
+        self.tasks_histogram = TaskHistogram.from_days({})
+        self.messages_data = MessageTable()
+        self.message_store = MessageStore()
+        self.messages_refresh = 60
+        # longer than the refresh, so the tables are answered from memory
+        # while the next refresh is still downloading them
+        self.messages_max_age = 2 * self.messages_refresh
+        self.message_changes = {}
+        # ETag and Last-Modified of the last messages of every type
+        self._message_validators = {}
+        # the areas are fetched once, not with every message located by them
+        self.area_bboxes = {}
         self.conditions_data = {
             "countryCode": None,
             "municipality": None,
             "road": None,
             "description": None,
             }
+        self.conditions_stats = {}
+        self.conditions_snapshots = {}
         self.weather_data = {
             "t2m": None,
             "ws_10min": None,
             "n_man": None,
             }
+        self.weather_series = {}
+        self.weather_stats = {}
 
-        # hard coded co-ordinates: xMin, yMin, xMax, yMax
-        self.coordinates = {
-            "Helsinki": (24, 60, 26, 61),
-            "Kuopio": (27, 62, 28, 64),
-            "Oulu": (24, 64, 26, 66),
-            "Pori": (21, 61, 22, 62),
-            "Tampere": (23, 61, 24, 62),
-        }
+        # co-ordinates of the locations: xMin, yMin, xMax, yMax
+        self.coordinates = LocationRegistry.load("assets/locations.json")
+
+        # pooled keep-alive connections, warmed in the background, one per
+        # worker so that no connection is dropped when all of them fetch
+        self.transport = Transport(hosts=("https://tie.digitraffic.fi",
+                                          "https://opendata.fmi.fi"),
+                                   pool_size=SOURCE_WORKERS + CHUNK_WORKERS
+                                   + SWEEP_WORKERS)
+        self.transport.warm()
+
+        # short ttl for live data, closed historical windows never change
+        self.cache = ResponseCache(ttls={
+            "tracking/routes": 60,
+            "road-conditions": 60,
+            "wfs": 300,
+        })
+
+        # tasks of chunks in the past never change, keep them across restarts
+        self.disk_cache = DiskCache(os.path.join(
+            os.path.expanduser("~"), ".cache", "traffico", "tasks.sqlite3"))
+
+        # one worker per source of the combined report
+        self.errors = {}
+        self.sweep_errors = {}
+        self._executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS,
+                                            thread_name_prefix="model")
+        # separate pool for the time window chunks and the message areas, so
+        # that a query running in the pools of the sources or of the sweep
+        # never waits for its own pool
+        self._chunk_executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS,
+                                                  thread_name_prefix="chunk")
+        # the messages sweep has its own pool too, so a combined report never
+        # waits behind the national downloads
+        self._sweep_executor = ThreadPoolExecutor(max_workers=SWEEP_WORKERS,
+                                                  thread_name_prefix="sweep")
+
+
+    def _fetch(self, endpoint, url, params=None, key=None, ttl=None):
+        # params in the url path are passed separately as the cache key
+        if key is None:
+            key = params
+
+        content = self.cache.get(endpoint, key)
+        if content is None:
+            res = self.transport.get(url=url, params=params)
+            # error responses are not cached, they fail the query
+            res.raise_for_status()
+            content = res.content
+            self.cache.put(endpoint, key, content, ttl=ttl)
+        return content
 
 
     def get_tasks_data(self, inputs):
+        start = datetime.strptime(inputs["start_time"], UTC_FORMAT)
+        end = datetime.strptime(inputs["end_time"], UTC_FORMAT)
+        bbox = self.coordinates[inputs["location"]]
+
+        # fetch the window one day and one grid tile at a time, so that
+        # overlapping windows and locations share their cached cells
+        futures = [
+            self._chunk_executor.submit(
+                self._get_tasks_cell, tiles.tile_bbox(tile, TILE_SIZE), *chunk)
+            for chunk in self._split_window(start, end)
+            for tile in tiles.tiles(bbox, TILE_SIZE)
+        ]
+
+        # clip the routes back to the bbox, a route crossing a tile edge is
+        # in the cells of both tiles but is counted once
+        routes = {}
+        try:
+            for future in futures:
+                for route_id, end_time, tasks, route_bbox in future.result():
+                    if route_bbox is not None \
+                            and not intersects(route_bbox, bbox):
+                        continue
+                    if route_id is None:
+                        route_id = len(routes), None
+                    routes[route_id] = (end_time, tasks)
+        except Exception:
+            # one failed cell fails the query, the cells not started are
+            # not needed anymore
+            for future in futures:
+                future.cancel()
+            raise
+
+        end_times = [route[0] for route in routes.values()]
+        tasks = [route[1] for route in routes.values()]
+        self.tasks_histogram = TaskHistogram.from_routes(end_times, tasks,
+                                                         start, end)
+        self.tasks_per_day = self.tasks_histogram.totals()
+
+
+    @staticmethod
+    def _split_window(start, end, size=timedelta(days=1)):
+        # chunks are aligned to UTC midnights so that the full days are shared
+        # between overlapping windows, and [endFrom, endBefore) never overlap
+        # so a route is counted only in the chunk its end time falls in
+        chunks = []
+        chunk_start = start
+        while chunk_start < end:
+            midnight = datetime.combine(chunk_start.date(), datetime.min.time())
+            chunk_end = min(midnight + size, end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+        return chunks
+
+
+    def _get_tasks_cell(self, bbox, start, end):
         url = "https://tie.digitraffic.fi/api/maintenance/v1/tracking/routes"
         params = {
             # quote func to encode input text to URI format
-            "endFrom": quote(inputs["start_time"]),
-            "endBefore": quote(inputs["end_time"]),
-            "xMin": self.coordinates[inputs["location"]][0],
-            "yMin": self.coordinates[inputs["location"]][1],
-            "xMax": self.coordinates[inputs["location"]][2],
-            "yMax": self.coordinates[inputs["location"]][3],
+            "endFrom": quote(start.strftime(UTC_FORMAT)),
+            "endBefore": quote(end.strftime(UTC_FORMAT)),
+            "xMin": bbox[0],
+            "yMin": bbox[1],
+            "xMax": bbox[2],
+            "yMax": bbox[3],
             "domain": "state-roads",
             "taskId": "",
         }
@@ -84,66 +300,246 @@ class Model:
             [f"{key}={params[key]}" for key in params.keys()]
         )
 
-        res = requests.get(url=url)
-        data = json.loads(res.text)
+        # the parsed cells are cached instead of the large raw responses
+        routes = self.cache.get("tracking/routes", params)
+        if routes is not None:
+            return routes
 
-        # calculate tasks per day
-        self.tasks_per_day = {}
-        try:
-            for feature in data['features']:
-                for task in feature['properties']['tasks']:
-                    self.tasks_per_day[task] = self.tasks_per_day.get(task,0)+1
-        except KeyError:
-            self.tasks_per_day = {}
+        # a cell that ended long enough ago can be cached for a long time,
+        # the late routes of a recent cell are fetched again when it expires
+        ttl = None
+        key = {"version": TASKS_CACHE_VERSION, **params}
+        historical = (end.replace(tzinfo=timezone.utc) + TASKS_GRACE
+                      < datetime.now(timezone.utc))
+        if historical:
+            ttl = 24 * 60 * 60
+            routes = self.disk_cache.get(key)
+            if routes is not None:
+                self.cache.put("tracking/routes", params, routes,
+                               size=len(json.dumps(routes)), ttl=ttl)
+                return routes
+
+        # keep only the id, end time, tasks and bbox of the routes while the
+        # response is streamed, so only one route geometry is in memory
+        routes = []
+        with self.transport.get(url=url, stream=True) as res:
+            # a failed cell fails the query, it is not a cell without routes
+            res.raise_for_status()
+            try:
+                for feature in iter_features(res.iter_content(64 * 1024)):
+                    properties = feature['properties']
+                    routes.append([properties.get('id'),
+                                   properties['endTime'],
+                                   properties['tasks'],
+                                   geometry_bbox(feature.get('geometry'))])
+            except KeyError:
+                # a successful response without a features array
+                return []
+
+        self.cache.put("tracking/routes", params, routes,
+                       size=len(json.dumps(routes)), ttl=ttl)
+        if historical:
+            self.disk_cache.put(key, routes)
+        return routes
 
 
     def get_conditions_data(self, inputs):
+        bbox = self.coordinates[inputs["location"]]
+
+        # all forecast hours are parsed at once, so another hour is answered
+        # from the snapshot until it expires
+        if not self.has_conditions_data(inputs):
+            self.conditions_snapshots[bbox] = ConditionsSnapshot(
+                self._get_conditions_stations(bbox),
+                ttl=self.cache.ttls["road-conditions"])
+        snapshot = self.conditions_snapshots[bbox]
+
+        # aggregate every station that matches the conditions user inputs
+        self.conditions_stats = snapshot.aggregate(inputs["hour"],
+                                                   inputs["precipitation"],
+                                                   inputs["condition"])
+        self.conditions_data = {
+            field: stats["mean"] if field in NUMERIC_FIELDS else stats
+            for field, stats in self.conditions_stats.items()
+        }
+
+
+    def has_conditions_data(self, inputs):
+        snapshot = self.conditions_snapshots.get(
+            self.coordinates[inputs["location"]])
+        return snapshot is not None and not snapshot.expired()
+
+
+    def _get_conditions_stations(self, bbox):
+        # whole tiles are shared with other locations, the stations have no
+        # coordinates to clip them with, so partly covered tiles are fetched
+        # only for the part inside the bbox
+        futures = [
+            self._chunk_executor.submit(
+                self._get_conditions_tile,
+                tiles.tile_bbox(tile, TILE_SIZE)
+                if tiles.covers(bbox, tile, TILE_SIZE)
+                else tiles.clip(bbox, tile, TILE_SIZE))
+            for tile in tiles.tiles(bbox, TILE_SIZE)
+        ]
+
+        # stations on a tile edge are in both tiles
+        stations = {}
+        for future in futures:
+            for station in future.result():
+                stations.setdefault(station.get("id"), station)
+        return list(stations.values())
+
+
+    def _get_conditions_tile(self, bbox):
         url = "https://tie.digitraffic.fi/api/v3/data/road-conditions"
 
         # join input parameters with the api endpoint as queries
-        url += "/" + "/".join(list(map(
-            str, self.coordinates[inputs["location"]]
-        )))
-        res = requests.get(url=url)
-        data = json.loads(res.text)
-
-        # parse the conditions user inputs
-        self.conditions_data = {}
+        url += "/" + "/".join(list(map(str, bbox)))
+        data = decoder.loads(self._fetch("road-conditions", url,
+                                         key={"bbox": bbox}))
         try:
-            for item in data["weatherData"][0]["roadConditions"]:
-                if item["forecastName"] == inputs["hour"].lower():
-                    self.conditions_data = item
-        except (KeyError, IndexError):
-            self.conditions_data = {}
+            return data["weatherData"]
+        except (KeyError, TypeError):
+            return []
 
 
     def get_messages_data(self, inputs):
+        # the parsed and indexed national list is kept in the store, so another
+        # location or type is answered without fetching or scanning it again
+        table = self.message_store.get(inputs["type"], self.messages_max_age)
+        if table is None:
+            table = self._sync_messages(inputs["type"]).table
+
+        # the combined report shows only the messages of its location
+        if "location" in inputs:
+            table = table.located_in(inputs["location"])
+        self.messages_data = table
+
+
+    def has_messages_data(self, inputs):
+        return self.message_store.get(inputs["type"],
+                                      self.messages_max_age) is not None
+
+
+    def sweep_messages(self, types):
+        futures = {
+            situation_type: self._sweep_executor.submit(self._sync_messages,
+                                                        situation_type)
+            for situation_type in types
+        }
+        # a failed type keeps its previous table, the others are still stored
+        errors = {}
+        for situation_type, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[situation_type] = str(e)
+        self.sweep_errors = errors
+        return errors
+
+
+    def _sync_messages(self, situation_type):
         url = "https://tie.digitraffic.fi/api/traffic-message/v1/messages"
         params = {
-            "situationType": inputs["type"],
+            "situationType": situation_type,
             "inactiveHours": 0,
+            # the area geometries would be sent again with every sync, they
+            # are looked up by their location codes instead
             "includeAreaGeometry": False
             }
-        res = requests.get(url=url, params=params)
-        data = json.loads(res.text)
+        base = self.message_store.get(situation_type)
+
+        # nothing changed since the last sync if the server says so
+        headers = self._message_validators.get(situation_type) \
+            if base is not None else None
+        res = self.transport.get(url=url, params=params, headers=headers)
+        if res.status_code == 304:
+            self.message_store.put(situation_type, base)
+            changes = ChangeSet(base, base)
+            self.message_changes[situation_type] = changes
+            return changes
+        data = decoder.loads(res.content)
 
-        # parse the traffic messages data
-        self.messages_data = []
+        # only the new situations and new versions are parsed, the situations
+        # missing from the active list have expired
+        versions = {} if base is None else base.versions()
+        changed = []
+        seen = set()
         for feature in data['features']:
-            row = {}
-            try:
-                row['countryCode'] = feature['properties']['announcements'][0]['location']['countryCode']
-            except (KeyError, IndexError): pass
-            try:
-                row['municipality'] = feature['properties']['announcements'][0]['locationDetails']['roadAddressLocation']['primaryPoint']['municipality']
-            except (KeyError, IndexError): pass
-            try:
-                row['road'] = feature['properties']['announcements'][0]['locationDetails']['roadAddressLocation']['primaryPoint']['roadAddress']['road']
-            except (KeyError, IndexError): pass
-            try:
-                row['description'] = feature['properties']['announcements'][0]['location']['description']
-            except (KeyError, IndexError): pass
-            self.messages_data.append(row)
+            properties = feature.get('properties') or {}
+            situation_id = properties.get('situationId')
+            version = properties.get('version')
+            if situation_id is not None:
+                seen.add(situation_id)
+                if (situation_id in versions
+                        and versions[situation_id] == version):
+                    continue
+            changed.append((situation_id, version, feature))
+
+        # the locations of a message are resolved once per version, by its
+        # geometry or else by the areas it is located by
+        self._load_areas({code for _, _, feature in changed
+                          if not feature.get('geometry')
+                          for code in area_codes(feature)})
+        upserts = []
+        for situation_id, version, feature in changed:
+            bbox = geometry_bbox(feature.get('geometry'))
+            if bbox is None:
+                bbox = union([self.area_bboxes.get(code)
+                              for code in area_codes(feature)])
+            locations = None if bbox is None \
+                else self.coordinates.find_bbox(bbox)
+            upserts.append((situation_id, version, extract_message(feature),
+                            locations))
+        removed = [situation_id for situation_id in versions
+                   if situation_id not in seen]
+
+        # the stored table may be on screen, so the changes go to a copy
+        table = MessageTable() if base is None else base.copy()
+        changes = table.apply(upserts, removed)
+        changes.base = base
+        if res.ok:
+            self.message_store.put(situation_type, table)
+            self.message_changes[situation_type] = changes
+            self._message_validators[situation_type] = {
+                header: res.headers[name]
+                for name, header in (("ETag", "If-None-Match"),
+                                     ("Last-Modified", "If-Modified-Since"))
+                if name in res.headers
+            }
+        return changes
+
+
+    def _load_areas(self, codes):
+        # the unknown areas are fetched concurrently, a failed one fails the
+        # sync so that its messages are not stored without their locations
+        futures = {
+            code: self._chunk_executor.submit(self._get_area_bbox, code)
+            for code in codes if code not in self.area_bboxes
+        }
+        try:
+            bboxes = {code: future.result()
+                      for code, future in futures.items()}
+        except Exception:
+            for future in futures.values():
+                future.cancel()
+            raise
+        self.area_bboxes.update(bboxes)
+
+
+    def _get_area_bbox(self, code):
+        url = ("https://tie.digitraffic.fi/api/traffic-message/v1/"
+               f"area-geometries/{code}")
+        params = {"includeGeometry": True}
+        res = self.transport.get(url=url, params=params)
+        res.raise_for_status()
+        data = decoder.loads(res.content)
+
+        # every version of the area is in the collection
+        features = data['features'] if 'features' in data else [data]
+        return union([geometry_bbox(feature.get('geometry'))
+                      for feature in features])
 
 
     def get_weather_data(self, inputs):
@@ -162,21 +558,56 @@ class Model:
             "parameters": "t2m,ws_10min,n_man",
             }
 
-        res = requests.get(url=url, params=params)
-        xml_data = ET.fromstring(res.content)
-        try:
-            self.weather_data["t2m"] = xml_data[0][0][3].text
-        except IndexError: pass
-        try:
-            self.weather_data["ws_10min"] = xml_data[1][0][3].text
-        except IndexError: pass
-        try:
-            self.weather_data["n_man"] = xml_data[2][0][3].text
-        except IndexError: pass
+        # the parsed series are cached instead of the large raw responses
+        series = self.cache.get("wfs", params)
+        if series is None:
+            with self.transport.get(url=url, params=params, stream=True) as res:
+                series = wfs.parse_series(res.iter_content(64 * 1024))
+            if res.ok:
+                self.cache.put("wfs", params, series,
+                               size=wfs.series_size(series))
+
+        # every station and timestep of the bbox instead of one sample
+        self.weather_series = series
+        self.weather_stats = wfs.aggregate(series, self.weather_data.keys())
+        self.weather_data = {
+            name: stats["mean"] for name, stats in self.weather_stats.items()
+        }
 
 
     def get_combined_data(self, inputs):
-        self.get_tasks_data(inputs)
-        self.get_conditions_data(inputs)
-        self.get_messages_data(inputs)
-        self.get_weather_data(inputs)
+        sources = {
+            "tasks": self.get_tasks_data,
+            "conditions": self.get_conditions_data,
+            "messages": self.get_messages_data,
+            "weather": self.get_weather_data,
+        }
+        # fetch all sources at once, so the report waits only for the slowest
+        futures = {
+            name: self._executor.submit(func, inputs)
+            for name, func in sources.items()
+        }
+
+        # a failed source is reset and reported instead of failing the report
+        self.errors = {}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                self.errors[name] = str(e)
+                self._reset_data(name)
+
+
+    def _reset_data(self, name):
+        if name == "tasks":
+            self.tasks_per_day = {}
+            self.tasks_histogram = TaskHistogram.from_days({})
+        elif name == "conditions":
+            self.conditions_data = {}
+            self.conditions_stats = {}
+        elif name == "messages":
+            self.messages_data = MessageTable()
+        elif name == "weather":
+            self.weather_data = dict.fromkeys(self.weather_data)
+            self.weather_series = {}
+            self.weather_stats = {}
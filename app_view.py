@@ -1,6 +1,41 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem
+import sys
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QWidget, QVBoxLayout, QHBoxLayout
 from interface import Ui_MainWindow
-from canvas import Canvas
+from message_model import MessageTableModel
+import profiler
+
+
+# submit button and location input of every page of the generated UI
+SUBMIT_BUTTONS = {
+    "main_page": "main_submit_btn",
+    "cond_page": "cond_submit_btn",
+    "msg_page": "msg_submit_btn",
+    "comb_page": "comb_submit_btn",
+}
+LOCATION_INPUTS = {
+    "main_page": "main_input_1",
+    "cond_page": "cond_input_1",
+    "comb_page": "comb_input_1",
+}
+
+# the items of the traffic messages input form, so the types are known before
+# its page is built
+MESSAGE_TYPES = ("TRAFFIC_ANNOUNCEMENT", "EXEMPTED_TRANSPORT",
+                 "WEIGHT_RESTRICTION", "ROAD_WORK")
+
+
+def import_canvas():
+    """
+    Imports the canvas module, and with it matplotlib and its Qt backend.
+    """
+    # timed only the first time, a pre-warmed import is already done
+    if "canvas" not in sys.modules:
+        with profiler.phase("import matplotlib"):
+            import canvas
+    import canvas
+    return canvas
 
 
 class MainWindow(QMainWindow):
@@ -17,23 +52,48 @@ class MainWindow(QMainWindow):
     ui: interface.Ui_MainWindow
         The main GUI object that has what the user see.
     canvas: canvas.Canvas
-        The Canvas object for making plots.
+        The Canvas object for making plots, None until the first plot.
     toolbar: matplotlib.backends.backend_qt.NavigationToolbar2QT
         The toolbat object on top of the plots.
+    messages_model: message_model.MessageTableModel
+        The model of the traffic messages table.
+    combined_messages_model: message_model.MessageTableModel
+        The model of the traffic messages table of the combined reports.
 
     Methods
     -------
     handle_signals()
         Handles all the button clicked signals from the GUI using slots from
         the GUI itself or from the Controller in case of input submit buttons.
+    show_page(name)
+        Shows the page of the generated UI, building it the first time.
+    build_page(name)
+        Builds the page of the generated UI if it is not built yet.
+    setup_page(name)
+        Connects the signals and fills the inputs of a page just built.
+    conditions_hour_changed()
+        Sends the forecast hour change to the Controller once road conditions
+        are shown.
+    messages_type_changed()
+        Sends the situation type change to the Controller once traffic
+        messages are shown.
+    messages_shown()
+        Returns True if the traffic messages results page is shown.
     setup_canvas()
-        Sets up the canvas for plotting bar chart on road maintainance page.
+        Sets up the canvas for plotting bar chart on road maintainance page,
+        once, when the first plot is shown or the canvas is pre-warmed.
+    setup_tables()
+        Sets up the models of the traffic messages tables.
+    setup_locations(names)
+        Fills the location combo boxes with the locations of the Model.
     get_tasks_input()
         Gets the user inputs from the road maintainance input form.
     get_conditions_input()
         Gets the user inputs from the road conditions input form.
     get_messages_input()
         Gets the user input from the traffic messages input form.
+    get_message_types()
+        Gets all the situation types of the traffic messages input form.
     get_combined_input()
         Gets the user input from the combined reports input form.
     update_tasks_widget(data)
@@ -42,23 +102,43 @@ class MainWindow(QMainWindow):
         Updates the road conditions page using the data from the Model.
     update_messages_widget(data)
         Updates the traffic messages page using the data from the Model.
+    update_messages_rows(changes)
+        Updates only the changed rows of the traffic messages page.
     update_combined_widget(tasks_data, conditions_data, messages_data, weather_data)
         Updates the combined reports page using the data from the Model.
+    set_busy(busy)
+        Shows or hides the busy state while queries run in the background.
+    show_error(message)
+        Shows the error message of a failed query.
+    show_sweep_errors(errors)
+        Shows the situation types the background refresh failed for in the
+        status bar.
     """
 
     def __init__(self, controller, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.controller = controller
 
-        # init UI
+        # init UI, only the landing page is built now, the other pages are
+        # built the first time they are shown
         self.ui = Ui_MainWindow()
-        self.ui.setupUi(self)
+        with profiler.phase("setupUi"):
+            self.ui.setupUi(self, pages=("main_page",))
+        self._locations = None
+        self._busy = False
+        self._sweep_failed = False
 
-        # set up the canvas
-        self.setup_canvas()
+        # the canvases are set up on the first plot, matplotlib is not
+        # imported before the window is shown
+        self.canvas = None
+        self.canvas_2 = None
+
+        # set up the messages tables
+        self.setup_tables()
 
         # handle all the button press signals
         self.handle_signals()
+        self.setup_page("main_page")
 
         # set min window size
         self.setMinimumSize(1080, 860)
@@ -66,37 +146,117 @@ class MainWindow(QMainWindow):
 
     def handle_signals(self):
         # change pages on clicked
-        self.ui.main_button.clicked.connect(lambda: self.ui.stacked_widget.setCurrentWidget(self.ui.main_page))
-        self.ui.cond_button.clicked.connect(lambda: self.ui.stacked_widget.setCurrentWidget(self.ui.cond_page))
-        self.ui.msg_button.clicked.connect(lambda: self.ui.stacked_widget.setCurrentWidget(self.ui.msg_page))
-        self.ui.comb_button.clicked.connect(lambda: self.ui.stacked_widget.setCurrentWidget(self.ui.comb_page))
+        self.ui.main_button.clicked.connect(lambda: self.show_page("main_page"))
+        self.ui.cond_button.clicked.connect(lambda: self.show_page("cond_page"))
+        self.ui.msg_button.clicked.connect(lambda: self.show_page("msg_page"))
+        self.ui.comb_button.clicked.connect(lambda: self.show_page("comb_page"))
+
 
+    def show_page(self, name):
+        self.build_page(name)
+        self.ui.stacked_widget.setCurrentWidget(getattr(self.ui, name))
+
+
+    def build_page(self, name):
+        # the widgets of a page exist only once it is built
+        if self.ui.setup_page(name):
+            self.setup_page(name)
+
+
+    def setup_page(self, name):
         # send signals to the controller
-        self.ui.main_submit_btn.clicked.connect(self.controller.submit_tasks)
-        self.ui.cond_submit_btn.clicked.connect(self.controller.submit_conditions)
-        self.ui.msg_submit_btn.clicked.connect(self.controller.submit_messages)
-        self.ui.comb_submit_btn.clicked.connect(self.controller.submit_combined)
+        if name == "main_page":
+            self.ui.main_submit_btn.clicked.connect(self.controller.submit_tasks)
+        elif name == "cond_page":
+            self.ui.cond_submit_btn.clicked.connect(self.controller.submit_conditions)
+            # update the shown road conditions when another hour is picked
+            self.ui.buttonGroup.buttonClicked.connect(self.conditions_hour_changed)
+        elif name == "msg_page":
+            self.ui.msg_submit_btn.clicked.connect(self.controller.submit_messages)
+            # and the shown traffic messages when another type is picked
+            self.ui.msg_input.currentTextChanged.connect(self.messages_type_changed)
+            self._set_table_model(self.ui.tableWidget, self.messages_model)
+        elif name == "comb_page":
+            self.ui.comb_submit_btn.clicked.connect(self.controller.submit_combined)
+            self._set_table_model(self.ui.tableWidget_2, self.combined_messages_model)
+
+        # a page built while queries run is busy too
+        getattr(self.ui, SUBMIT_BUTTONS[name]).setEnabled(not self._busy)
+        if self._locations is not None and name in LOCATION_INPUTS:
+            self._set_locations(getattr(self.ui, LOCATION_INPUTS[name]))
+
+
+    def conditions_hour_changed(self):
+        # only once the results are shown, the submit button does the rest
+        if self.ui.stacked_widget_2.currentIndex() == 1 and not self._busy:
+            self.controller.select_conditions_hour()
+
+
+    def messages_type_changed(self):
+        if self.messages_shown() and not self._busy:
+            self.controller.select_messages_type()
+
+
+    def messages_shown(self):
+        return self.ui.msg_page is not None \
+            and self.ui.stacked_widget_3.currentIndex() == 1
 
 
     def setup_canvas(self):
-        # init canvas
-        self.canvas = Canvas()
-        self.toolbar = self.canvas.get_toolbar()
+        # matplotlib and its Qt backend are imported only here
+        Canvas = import_canvas().Canvas
+
+        # init canvas, each once its page is built
+        if self.canvas is None and self.ui.main_page is not None:
+            with profiler.phase("create canvas"):
+                self.canvas = Canvas()
+                self.toolbar = self.canvas.get_toolbar()
+
+                # add the canvas and the toolbar to the layout and then to the widget
+                self.ui.canvas_layout = QVBoxLayout()
+                self.ui.canvas_layout.addWidget(self.toolbar)
+                self.ui.canvas_layout.addWidget(self.canvas)
+                self.ui.canvas_widget.setLayout(self.ui.canvas_layout)
+
         # 2nd canvas for combined report
-        self.canvas_2 = Canvas()
-        self.toolbar_2 = self.canvas_2.get_toolbar()
+        if self.canvas_2 is None and self.ui.comb_page is not None:
+            with profiler.phase("create canvas_2"):
+                self.canvas_2 = Canvas()
+                self.toolbar_2 = self.canvas_2.get_toolbar()
+
+                self.ui.canvas_layout_2 = QVBoxLayout()
+                self.ui.canvas_layout_2.addWidget(self.toolbar_2)
+                self.ui.canvas_layout_2.addWidget(self.canvas_2)
+                self.ui.canvas_widget_2.setLayout(self.ui.canvas_layout_2)
 
-        # layouts for the canvas and the toolbar
-        self.ui.canvas_layout = QVBoxLayout()
-        self.ui.canvas_layout_2 = QVBoxLayout()
 
-        # add the canvas and the toolbar to the layout and then to the widget
-        self.ui.canvas_layout.addWidget(self.toolbar)
-        self.ui.canvas_layout.addWidget(self.canvas)
-        self.ui.canvas_widget.setLayout(self.ui.canvas_layout)
-        self.ui.canvas_layout_2.addWidget(self.toolbar_2)
-        self.ui.canvas_layout_2.addWidget(self.canvas_2)
-        self.ui.canvas_widget_2.setLayout(self.ui.canvas_layout_2)
+    def setup_tables(self):
+        # both tables read their cells from the message tables on demand,
+        # the models exist before the pages of the tables are built
+        self.messages_model = MessageTableModel(self)
+        self.combined_messages_model = MessageTableModel(self)
+
+
+    @staticmethod
+    def _set_table_model(table, model):
+        table.setModel(model)
+        font = table.font()
+        font.setBold(True)
+        table.horizontalHeader().setFont(font)
+
+
+    def setup_locations(self, names):
+        # replace the locations of the generated UI with the registry ones,
+        # on the pages built so far and on the others once they are built
+        self._locations = list(names)
+        for page, combo in LOCATION_INPUTS.items():
+            if getattr(self.ui, page) is not None:
+                self._set_locations(getattr(self.ui, combo))
+
+
+    def _set_locations(self, combo):
+        combo.clear()
+        combo.addItems(self._locations)
 
 
     def get_tasks_input(self):
@@ -110,6 +270,7 @@ class MainWindow(QMainWindow):
 
 
     def get_conditions_input(self):
+        self.build_page("cond_page")
         inputs = {}
         inputs["location"] = self.ui.cond_input_1.currentText()
         inputs["precipitation"] = self.ui.cond_input_2.currentText()
@@ -120,12 +281,18 @@ class MainWindow(QMainWindow):
 
 
     def get_messages_input(self):
+        self.build_page("msg_page")
         inputs = {}
         inputs["type"] = self.ui.msg_input.currentText()
         return inputs
 
 
+    def get_message_types(self):
+        return list(MESSAGE_TYPES)
+
+
     def get_combined_input(self):
+        self.build_page("comb_page")
         inputs = {}
 
         utc = "yyyy-MM-ddThh:mm:ssZ"
@@ -135,6 +302,7 @@ class MainWindow(QMainWindow):
         inputs["end_time"] = self.ui.comb_input_4.dateTime().toString(utc)
 
         # default inputs for unspecified items (taken from road conditions page)
+        self.build_page("cond_page")
         inputs["precipitation"] = self.ui.cond_input_2.currentText()
         inputs["condition"] = self.ui.cond_input_3.currentText()
         inputs["hour"] = self.ui.buttonGroup.checkedButton().text()
@@ -144,14 +312,15 @@ class MainWindow(QMainWindow):
 
     def update_tasks_widget(self, data):
         # DEBUG: prints the data to the shell
-        print(data)
+        print(data.totals())
 
         # reset input form
         # self.ui.main_input_1.setCurrentIndex(0)
 
-        # clear the canvas and add tasks per day bar plot
-        self.canvas.clear()
-        self.canvas.plot(data)
+        # tasks per day bar plot, the bars are reused if the days and tasks
+        # are the same as in the plot shown
+        self.setup_canvas()
+        self.canvas.plot_histogram(data)
 
         # switch to the results page
         self.ui.stacked_widget_1.setCurrentIndex(1)
@@ -185,18 +354,18 @@ class MainWindow(QMainWindow):
         # reset input form
         # self.ui.msg_input.setCurrentIndex(0)
 
-        # add table data row by row to the tableWidget
-        self.ui.tableWidget.setRowCount(len(data))
-        for row, item in enumerate(data):
-            self.ui.tableWidget.setItem(row, 0, QTableWidgetItem(str(item["countryCode"])))
-            self.ui.tableWidget.setItem(row, 1, QTableWidgetItem(str(item["municipality"])))
-            self.ui.tableWidget.setItem(row, 2, QTableWidgetItem(str(item["road"])))
-            self.ui.tableWidget.setItem(row, 3, QTableWidgetItem(str(item["description"])))
+        # show the table, the rows are read only when they are on screen
+        self.messages_model.set_table(data)
 
         # switch to the results page
         self.ui.stacked_widget_3.setCurrentIndex(1)
 
 
+    def update_messages_rows(self, changes):
+        # only the rows of the changed situations are signalled to the view
+        self.messages_model.apply(changes)
+
+
     def update_combined_widget(self, tasks_data, conditions_data, messages_data, weather_data):
         # DEBUG: prints the data to the shell
         print(weather_data)
@@ -205,30 +374,55 @@ class MainWindow(QMainWindow):
         # self.ui.msg_input.setCurrentIndex(0)
 
 
-        # add weather data
-        self.ui.weather_data_1.setText(str(weather_data["t2m"]))
-        self.ui.weather_data_2.setText(str(weather_data["ws_10min"]))
-        self.ui.weather_data_3.setText(str(weather_data["n_man"]))
+        # add weather data (sources that failed have no values)
+        self.ui.weather_data_1.setText(str(weather_data.get("t2m")))
+        self.ui.weather_data_2.setText(str(weather_data.get("ws_10min")))
+        self.ui.weather_data_3.setText(str(weather_data.get("n_man")))
 
         # add road maintainance plots
-        self.canvas_2.clear()
-        self.canvas_2.plot(tasks_data)
+        self.setup_canvas()
+        self.canvas_2.plot_histogram(tasks_data)
 
         # add road conditions data
-        self.ui.cond_data_7.setText(str(conditions_data["roadTemperature"]))
-        self.ui.cond_data_8.setText(str(conditions_data["temperature"]))
-        self.ui.cond_data_9.setText(str(conditions_data["windSpeed"]))
-        self.ui.cond_data_10.setText(str(conditions_data["windDirection"]))
-        self.ui.cond_data_11.setText(str(conditions_data["type"]))
-        self.ui.cond_data_12.setText(str(conditions_data["reliability"]))
+        self.ui.cond_data_7.setText(str(conditions_data.get("roadTemperature")))
+        self.ui.cond_data_8.setText(str(conditions_data.get("temperature")))
+        self.ui.cond_data_9.setText(str(conditions_data.get("windSpeed")))
+        self.ui.cond_data_10.setText(str(conditions_data.get("windDirection")))
+        self.ui.cond_data_11.setText(str(conditions_data.get("type")))
+        self.ui.cond_data_12.setText(str(conditions_data.get("reliability")))
 
         # add traffic mesages table data
-        self.ui.tableWidget_2.setRowCount(len(messages_data))
-        for row, item in enumerate(messages_data):
-            self.ui.tableWidget_2.setItem(row, 0, QTableWidgetItem(str(item["countryCode"])))
-            self.ui.tableWidget_2.setItem(row, 1, QTableWidgetItem(str(item["municipality"])))
-            self.ui.tableWidget_2.setItem(row, 2, QTableWidgetItem(str(item["road"])))
-            self.ui.tableWidget_2.setItem(row, 3, QTableWidgetItem(str(item["description"])))
+        self.combined_messages_model.set_table(messages_data)
 
         # switch to the results page
         self.ui.stacked_widget_4.setCurrentIndex(1)
+
+
+    def set_busy(self, busy):
+        if busy == self._busy:
+            return
+        self._busy = busy
+
+        # wait cursor and no new submits while the queries are running
+        if busy:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+        else:
+            QApplication.restoreOverrideCursor()
+        for page, button in SUBMIT_BUTTONS.items():
+            if getattr(self.ui, page) is not None:
+                getattr(self.ui, button).setEnabled(not busy)
+
+
+    def show_error(self, message):
+        QMessageBox.warning(self, "Error", message)
+
+
+    def show_sweep_errors(self, errors):
+        # not a user query, so a status bar message instead of a dialog, the
+        # status bar is created only once a refresh fails
+        if errors:
+            self.statusBar().showMessage(
+                "Traffic messages not refreshed: " + ", ".join(sorted(errors)))
+        elif self._sweep_failed:
+            self.statusBar().clearMessage()
+        self._sweep_failed = bool(errors)
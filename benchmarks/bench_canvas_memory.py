@@ -0,0 +1,94 @@
+"""
+Checks that the canvases do not leak memory over thousands of redraws.
+
+Redraws one canvas with a new histogram layout, an in-place update and a
+blitted refresh in turn, then creates and disposes canvases one after the
+other, printing the resident set size along the way. The RSS of each phase
+should stay flat after its warm-up. Runs headless, from the project root:
+
+    python -m benchmarks.bench_canvas_memory
+"""
+import gc
+import os
+import resource
+
+# no display needed, the canvases are drawn to their Agg buffers
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QApplication
+
+from canvas import Canvas
+from histogram import TaskHistogram
+
+
+def rss():
+    # current RSS in MB on Linux, the peak RSS elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def make_histogram(rng, days):
+    start = np.datetime64("2024-01-01")
+    return TaskHistogram(["BRUSHING", "PAVING", "PLOUGHING", "SALTING"],
+                         np.arange(start, start + days),
+                         rng.integers(0, 20, (4, days)))
+
+
+def settle(app):
+    # run the pending draws and the deleteLater of the disposed canvases
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+def check(name, samples, tolerance):
+    # growth over the second half, after the caches have warmed up
+    half = samples[len(samples) // 2:]
+    growth = half[-1] - half[0]
+    print(f"{name:<10}" + " ".join(f"{mb:7.1f}" for mb in samples)
+          + f"   growth {growth:+.1f} MB")
+    return growth <= tolerance
+
+
+def main(redraws=3000, canvases=300, every=10, tolerance=5):
+    app = QApplication.instance() or QApplication([])
+    rng = np.random.default_rng(0)
+
+    canvas = Canvas()
+    canvas.resize(800, 500)
+    canvas.show()
+    samples = []
+    for i in range(redraws):
+        # a new number of days is a new layout, the same one is an update
+        days = 7 + i // 3 % 5
+        canvas.plot_histogram(make_histogram(rng, days), blit=i % 3 == 2)
+        canvas.draw()
+        if i % (redraws // every) == 0:
+            settle(app)
+            samples.append(rss())
+    ok = check("redraws", samples, tolerance)
+    canvas.dispose()
+
+    samples = []
+    for i in range(canvases):
+        canvas = Canvas()
+        canvas.plot_histogram(make_histogram(rng, 7))
+        canvas.draw()
+        canvas.dispose()
+        if i % (canvases // every) == 0:
+            settle(app)
+            samples.append(rss())
+    ok = check("canvases", samples, tolerance) and ok
+
+    print("flat" if ok else "growing")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""
+Benchmarks the JSON decoding backends on the Digitraffic API responses.
+
+One sample response of every JSON endpoint used by the Model is downloaded
+and decoded with every installed backend. Run from the project root:
+
+    python -m benchmarks.bench_decode
+"""
+import timeit
+
+import decoder
+from transport import Transport
+
+
+SAMPLES = {
+    "tracking/routes": (
+        "https://tie.digitraffic.fi/api/maintenance/v1/tracking/routes",
+        {"xMin": 24, "yMin": 60, "xMax": 26, "yMax": 61,
+         "domain": "state-roads"},
+    ),
+    "road-conditions": (
+        "https://tie.digitraffic.fi/api/v3/data/road-conditions/24/60/26/61",
+        None,
+    ),
+    "messages": (
+        "https://tie.digitraffic.fi/api/traffic-message/v1/messages",
+        {"situationType": "TRAFFIC_ANNOUNCEMENT", "inactiveHours": 0,
+         "includeAreaGeometry": False},
+    ),
+}
+
+
+def main(repeat=5):
+    transport = Transport()
+    print(f"{'endpoint':<18}{'size':>12}  " + "".join(
+        f"{name:>12}" for name in decoder.BACKENDS))
+
+    for endpoint, (url, params) in SAMPLES.items():
+        content = transport.get(url=url, params=params).content
+        times = []
+        for name in decoder.BACKENDS:
+            loads = decoder.get_decoder(name)
+            number = 3
+            best = min(timeit.repeat(lambda: loads(content),
+                                     number=number, repeat=repeat))
+            times.append(best / number * 1000)
+        print(f"{endpoint:<18}{len(content):>12}  " + "".join(
+            f"{t:>10.2f}ms" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmarks the per-feature cost of parsing the traffic messages.
+
+Compares the nested dict walks with try/except of every field against the
+compiled field extractor on synthetic message features, with every field
+present and with the location details missing. Run from the project root:
+
+    python -m benchmarks.bench_extract
+"""
+import json
+import timeit
+
+from app_model import extract_message
+
+
+def extract_try(feature):
+    row = {}
+    try:
+        row['countryCode'] = feature['properties']['announcements'][0]['location']['countryCode']
+    except (KeyError, IndexError): pass
+    try:
+        row['municipality'] = feature['properties']['announcements'][0]['locationDetails']['roadAddressLocation']['primaryPoint']['municipality']
+    except (KeyError, IndexError): pass
+    try:
+        row['road'] = feature['properties']['announcements'][0]['locationDetails']['roadAddressLocation']['primaryPoint']['roadAddress']['road']
+    except (KeyError, IndexError): pass
+    try:
+        row['description'] = feature['properties']['announcements'][0]['location']['description']
+    except (KeyError, IndexError): pass
+    return row
+
+
+def make_feature(i, details=True):
+    announcement = {
+        "location": {"countryCode": "FI", "description": f"Road {i} closed"},
+    }
+    if details:
+        announcement["locationDetails"] = {
+            "roadAddressLocation": {
+                "primaryPoint": {
+                    "municipality": "Helsinki",
+                    "roadAddress": {"road": i % 1000},
+                },
+            },
+        }
+    return {"type": "Feature", "properties": {"announcements": [announcement]}}
+
+
+def main(n=1000, number=20, repeat=7):
+    for label, details in (("all fields", True), ("no details", False)):
+        # decoded like a real response, not built object by object
+        features = json.loads(json.dumps(
+            [make_feature(i, details) for i in range(n)]))
+        for name, func in (("try/except", extract_try),
+                           ("compiled", extract_message)):
+            best = min(timeit.repeat(lambda: [func(f) for f in features],
+                                     number=number, repeat=repeat))
+            ns = best / number / n * 1e9
+            print(f"{label:<12}{name:<12}{ns:>8.0f} ns/feature")
+
+
+if __name__ == "__main__":
+    main()
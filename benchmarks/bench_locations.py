@@ -0,0 +1,55 @@
+"""
+Benchmarks the point and bbox lookups of the location registry.
+
+Loads the test fixture of hundreds of overlapping regions, municipalities and
+contract areas and compares the grid index lookups with a scan of every
+location, for random points and for bboxes of a message area and of a city.
+Run from the project root:
+
+    python -m benchmarks.bench_locations
+"""
+import random
+import timeit
+
+from locations import LocationRegistry
+from spatial import intersects
+
+
+FIXTURE = "tests/fixtures/locations.json"
+
+
+def scan_point(registry, x, y):
+    return [name for name, box in registry.items()
+            if box[0] <= x <= box[2] and box[1] <= y <= box[3]]
+
+
+def scan_bbox(registry, bbox):
+    return [name for name, box in registry.items() if intersects(box, bbox)]
+
+
+def main(queries=1000):
+    registry = LocationRegistry.load(FIXTURE)
+    rng = random.Random(0)
+    points = [(rng.uniform(19, 32), rng.uniform(59, 71))
+              for _ in range(queries)]
+
+    cases = {
+        "point": (lambda: [registry.find_point(x, y) for x, y in points],
+                  lambda: [scan_point(registry, x, y) for x, y in points]),
+    }
+    for label, size in (("area bbox", 0.2), ("city bbox", 1.0)):
+        boxes = [(x, y, x + size, y + size) for x, y in points]
+        cases[label] = (
+            lambda boxes=boxes: [registry.find_bbox(b) for b in boxes],
+            lambda boxes=boxes: [scan_bbox(registry, b) for b in boxes])
+
+    print(f"{len(registry)} locations, us per lookup")
+    print(f"{'':<12}{'index':>10}{'scan':>10}")
+    for label, (index, scan) in cases.items():
+        index_us = min(timeit.repeat(index, number=1, repeat=5)) / queries * 1e6
+        scan_us = min(timeit.repeat(scan, number=1, repeat=5)) / queries * 1e6
+        print(f"{label:<12}{index_us:>10.1f}{scan_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
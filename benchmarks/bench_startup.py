@@ -0,0 +1,69 @@
+"""
+Benchmarks the eager and the lazy construction of the generated UI.
+
+Builds the main window with all four pages at once, like setupUi always did,
+and with only the landing page, then shows it and waits for the first paint.
+The cost of building each other page on its first click is printed too.
+Runs headless, from the project root:
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import statistics
+import time
+
+# no display needed, the offscreen platform still lays out and paints
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QMainWindow
+
+from interface import Ui_MainWindow
+
+
+def first_paint(app, pages):
+    start = time.perf_counter()
+    window = QMainWindow()
+    ui = Ui_MainWindow()
+    ui.setupUi(window, pages=pages)
+    built = time.perf_counter()
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+    return window, ui, (built - start) * 1000, (shown - start) * 1000
+
+
+def main(repeat=20):
+    app = QApplication.instance() or QApplication([])
+    with open("assets/style.css") as f:
+        app.setStyleSheet(f.read())
+
+    results = {}
+    later = {page: [] for page in Ui_MainWindow.PAGES[1:]}
+    for _ in range(repeat):
+        for label, pages in (("eager", Ui_MainWindow.PAGES),
+                             ("lazy", Ui_MainWindow.PAGES[:1])):
+            window, ui, setup, shown = first_paint(app, pages)
+            results.setdefault(label, []).append((setup, shown))
+            if label == "lazy":
+                # the first click on the nav button of every other page
+                for page in later:
+                    start = time.perf_counter()
+                    ui.setup_page(page)
+                    ui.stacked_widget.setCurrentWidget(getattr(ui, page))
+                    app.processEvents()
+                    later[page].append((time.perf_counter() - start) * 1000)
+            window.close()
+            window.deleteLater()
+            app.processEvents()
+
+    print(f"{'':<10}{'setupUi':>10}{'first paint':>14}")
+    for label, times in results.items():
+        setup = statistics.median(t[0] for t in times)
+        shown = statistics.median(t[1] for t in times)
+        print(f"{label:<10}{setup:>8.1f}ms{shown:>12.1f}ms")
+    for page, times in later.items():
+        print(f"{page:<10}{statistics.median(times):>8.1f}ms   on first show")
+
+
+if __name__ == "__main__":
+    main()
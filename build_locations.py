@@ -0,0 +1,88 @@
+"""
+Builds assets/locations.json from the boundaries of the areas of Finland.
+
+The municipalities and the regions are read from the open WFS service of
+Statistics Finland and the maintenance contract areas from a GeoJSON file,
+e.g. the contract areas download of the Finnish Transport Infrastructure
+Agency. Every area is stored with its name, kind and WGS84 bbox, grouped by
+kind and sorted by name. Run it from the project root, the contract areas
+are optional:
+
+    python build_locations.py [contract_areas.geojson [name_property]]
+"""
+import json
+import sys
+
+import requests
+
+from spatial import geometry_bbox
+
+
+WFS = "https://geo.stat.fi/geoserver/tilastointialueet/wfs"
+
+# the layers of the latest statistical areas and their kind in the file
+LAYERS = {
+    "region": "tilastointialueet:maakunta4500k",
+    "municipality": "tilastointialueet:kunta4500k",
+}
+
+
+def fetch_layer(layer):
+    # WFS 1.0.0 keeps the lon/lat axis order of EPSG:4326
+    params = {
+        "service": "WFS",
+        "version": "1.0.0",
+        "request": "GetFeature",
+        "typeName": layer,
+        "outputFormat": "application/json",
+        "srsName": "EPSG:4326",
+    }
+    res = requests.get(WFS, params=params, timeout=(3.05, 60))
+    res.raise_for_status()
+    return res.json()["features"]
+
+
+def locations(features, kind, name="nimi"):
+    found = []
+    for feature in features:
+        bbox = geometry_bbox(feature.get("geometry"))
+        if bbox is None:
+            continue
+        # every latitude of Finland is above its longitudes, so an answer in
+        # lat/lon order is recognized and swapped
+        if bbox[0] > bbox[1]:
+            bbox = (bbox[1], bbox[0], bbox[3], bbox[2])
+        found.append({
+            "name": feature["properties"][name],
+            "kind": kind,
+            "bbox": [round(value, 4) for value in bbox],
+        })
+    return sorted(found, key=lambda location: location["name"])
+
+
+def main(contracts=None, name="nimi", path="assets/locations.json"):
+    found = []
+    for kind, layer in LAYERS.items():
+        found += locations(fetch_layer(layer), kind)
+    if contracts is not None:
+        with open(contracts, "r", encoding="utf-8") as f:
+            found += locations(json.load(f)["features"], "contract area", name)
+
+    # a name used by several kinds is told apart by its kind
+    counts = {}
+    for location in found:
+        counts[location["name"]] = counts.get(location["name"], 0) + 1
+    for location in found:
+        if counts[location["name"]] > 1:
+            location["name"] += f" ({location['kind']})"
+
+    lines = [json.dumps(location, ensure_ascii=False) for location in found]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n    "locations": [\n        ')
+        f.write(",\n        ".join(lines))
+        f.write("\n    ]\n}\n")
+    print(f"{len(found)} locations written to {path}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    ResponseCache class for keeping API responses in memory.
+
+    Entries are keyed on the endpoint and the normalized query parameters and
+    expire after a per-endpoint time to live. The cache is bounded both by the
+    number of entries and by their total size, and the least recently used
+    entries are evicted first.
+
+    Attributes
+    ----------
+    ttls: dict
+        The dict of time to live in seconds per endpoint.
+    default_ttl: float
+        The time to live in seconds for endpoints missing from ttls.
+    max_entries: int
+        The max number of entries kept in the cache.
+    max_bytes: int
+        The max total size in bytes of the entries kept in the cache.
+    hits: int
+        The number of lookups that were answered from the cache.
+    misses: int
+        The number of lookups that were missing or expired.
+
+    Methods
+    -------
+    key(endpoint, params=None)
+        Returns the cache key of the endpoint and the normalized parameters.
+    get(endpoint, params=None)
+        Returns the cached value or None if it is missing or expired.
+    put(endpoint, params, value, size=None, ttl=None)
+        Stores the value and evicts entries over the bounds.
+    clear()
+        Removes all the entries.
+    stats()
+        Returns the dict of hit/miss counters and the current size.
+    """
+
+    def __init__(self, ttls=None, default_ttl=60, max_entries=256,
+                 max_bytes=64 * 1024 * 1024):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # key: (expires, size, value), ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def key(endpoint, params=None):
+        # same query in any key order or value type gives the same key
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return (endpoint, tuple(items))
+
+
+    def get(self, endpoint, params=None):
+        key = self.key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, value = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def put(self, endpoint, params, value, size=None, ttl=None):
+        if ttl is None:
+            ttl = self.ttls.get(endpoint, self.default_ttl)
+        if size is None:
+            size = len(value)
+        # too big to ever fit, caching it would only flush everything else
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        key = self.key(endpoint, params)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -1,54 +1,234 @@
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.transforms import Bbox
 
 
 class Canvas(FigureCanvas):
     """
     Canvas class for plotting charts.
 
-    This class sets up the canvas and plots bar chart using the data from the
-    user.
+    This class sets up the canvas and plots the tasks per day histogram as a
+    bar chart.
+
+    The figure is a bare matplotlib Figure owned by the canvas, not a pyplot
+    figure, so no global figure manager keeps it alive and dispose() frees it
+    with the canvas.
+
+    The bars of a plot are kept while the next plot has the same bars (the
+    same labels, tasks and days), only the heights of the bars that changed
+    are set and the figure is redrawn with draw_idle. With blit=True a
+    refresh whose bars still fit in the axes redraws only the columns of the
+    changed bars on top of a saved background, instead of the whole figure.
 
     Attributes
     ----------
     fig: matplotlib.figure.Figure
         The figure object to hold the entire plot.
-    ax: matplotlib.axes._subplots.AxesSubplot
+    ax: matplotlib.axes.Axes
         The axes object for the plot.
 
     Methods
     -------
     get_toolbar(parent=None)
         Returns the toolbar widget to the GUI.
-    plot(data)
-        Plots the bar chart from the data parameter.
+    plot_histogram(histogram, stacked=True, blit=False)
+        Plots the tasks per day as stacked or grouped bars.
     clear()
         Clears the current plot.
+    dispose()
+        Frees the figure and deletes the canvas widget.
     """
 
     def __init__(self):
         # init figure and axes
-        self.fig, self.ax = plt.subplots(figsize=(1, 1), dpi=100)
+        self.fig = Figure(figsize=(1, 1), dpi=100)
+        self.ax = self.fig.add_subplot()
         super().__init__(self.fig)
 
+        # bars of the current plot, a task x column matrix of rectangles
+        self._layout = None
+        self._bars = []
+        self._heights = np.zeros((0, 0))
+        self._bottoms = np.zeros((0, 0))
+
+        # saved pixels of every column without its bars, for blitting
+        self._background = None
+        self._resize_cid = self.mpl_connect("resize_event",
+                                            lambda event: self._invalidate())
+
 
     def get_toolbar(self, parent=None):
         return NavigationToolbar(self, parent)
 
 
-    def plot(self, data):
-        self.ax.bar(range(len(data)),
-                    list(data.values()),
-                    align="center",
-                    alpha=0.5)
-        self.ax.set_xticks(range(len(data)), list(data.keys()))
-        self.ax.set_xlabel("Tasks")
-        self.ax.set_ylabel("Frequency")
-        self.ax.set_title("Tasks per day")
-        # interactive mode on
-        plt.ion()
+    def plot_histogram(self, histogram, stacked=True, blit=False):
+        days = [str(day)[5:] for day in histogram.days]
+        x = np.arange(len(days))
+        counts = np.asarray(histogram.counts, dtype=float).reshape(
+            len(histogram), len(days))
+        # stacked bars start at the top of the tasks below them
+        bottoms = np.cumsum(counts, axis=0) - counts if stacked \
+            else np.zeros_like(counts)
+        layout = ("histogram", stacked, tuple(histogram.tasks), tuple(days))
+
+        if layout != self._layout:
+            self.clear()
+            # grouped bars share the width of one day
+            width = 0.8 if stacked else 0.8 / max(len(histogram), 1)
+            containers = []
+            for i, task in enumerate(histogram.tasks):
+                if stacked:
+                    containers.append(self.ax.bar(x, counts[i], width,
+                                                  bottom=bottoms[i],
+                                                  label=task))
+                else:
+                    containers.append(self.ax.bar(x - 0.4 + width * (i + 0.5),
+                                                  counts[i], width,
+                                                  label=task))
+
+            self.ax.set_xticks(x, days, rotation=45 if len(days) > 7 else 0)
+            self.ax.set_xlabel("Day")
+            self.ax.set_ylabel("Tasks")
+            self.ax.set_title("Tasks per day")
+            if len(histogram):
+                self.ax.legend(fontsize="small")
+            self._set_bars(layout, containers, counts, bottoms)
+        else:
+            self._update(counts, bottoms, blit)
+
+
+    def _set_bars(self, layout, containers, heights, bottoms):
+        self._layout = layout
+        self._bars = [list(container.patches) for container in containers]
+        self._heights = heights
+        self._bottoms = bottoms
+        self.draw_idle()
+
+
+    def _update(self, heights, bottoms, blit):
+        # only the bars of the columns with a new value are touched
+        changed = np.flatnonzero(((heights != self._heights)
+                                  | (bottoms != self._bottoms)).any(axis=0))
+        if not len(changed):
+            return
+        for row, bars in enumerate(self._bars):
+            for col in changed:
+                bars[col].set_height(heights[row, col])
+                bars[col].set_y(bottoms[row, col])
+        self._heights = heights
+        self._bottoms = bottoms
+
+        top = (heights + bottoms).max(initial=0)
+        if blit and self._blit(changed, top):
+            return
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.draw_idle()
+
+
+    def _columns(self, pad=3):
+        # the axes split at the middle between the days, so every column has
+        # all the bars of one day and none of the others, the columns are whole
+        # pixels and padded over the spines around the axes
+        x0, y0, x1, y1 = self.ax.bbox.extents
+        n = len(self._heights[0]) if len(self._heights) else 0
+        edges = self.ax.transData.transform(
+            np.column_stack([np.arange(n + 1) - 0.5, np.zeros(n + 1)]))[:, 0]
+        edges = np.round(np.clip(edges, x0, x1))
+        edges[0], edges[-1] = np.floor(x0) - pad, np.ceil(x1) + pad
+        y0, y1 = np.floor(y0) - pad, np.ceil(y1) + pad
+        return [Bbox([[edges[i], y0], [edges[i + 1], y1]]) for i in range(n)]
+
+
+    def _overlay(self):
+        # the artists drawn over the bars, they are left out of the background
+        # so that a blit draws them only once
+        artists = list(self.ax.spines.values())
+        legend = self.ax.get_legend()
+        if legend is not None:
+            artists.append(legend)
+        return artists
+
+
+    def _save_background(self):
+        # draw once without the bars and keep the pixels of every column
+        hidden = [bar for row in self._bars for bar in row] + self._overlay()
+        for artist in hidden:
+            artist.set_visible(False)
+        self.draw()
+        columns = self._columns()
+        self._background = {
+            "view": self.ax.viewLim.bounds,
+            "columns": columns,
+            "regions": [self.copy_from_bbox(column) for column in columns],
+        }
+        for artist in hidden:
+            artist.set_visible(True)
+
+
+    def _invalidate(self):
+        self._background = None
+
+
+    def _blit(self, changed, top):
+        # a new scale or a zoom changes every pixel, that needs a full draw
+        if top > self.ax.get_ylim()[1]:
+            return False
+        if self._background is None \
+                or self._background["view"] != self.ax.viewLim.bounds:
+            self._save_background()
+            return False
+
+        # the columns under the legend are redrawn with it
+        legend = self.ax.get_legend()
+        boxes = self._background["columns"]
+        columns = set(changed.tolist())
+        hit = []
+        if legend is not None:
+            extent = legend.get_window_extent()
+            hit = [i for i, column in enumerate(boxes)
+                   if column.overlaps(extent)]
+            if columns.intersection(hit):
+                columns.update(hit)
+
+        # restore every run of adjacent columns, then draw the bars, the
+        # spines clipped to the run and the legend in the order of a full draw
+        runs = []
+        for col in sorted(columns):
+            if runs and runs[-1][-1] == col - 1:
+                runs[-1].append(col)
+            else:
+                runs.append([col])
+        for run in runs:
+            box = Bbox.union([boxes[col] for col in run])
+            for col in run:
+                self.restore_region(self._background["regions"][col])
+                for bars in self._bars:
+                    self.ax.draw_artist(bars[col])
+            for spine in self.ax.spines.values():
+                spine.set_clip_box(box)
+                self.ax.draw_artist(spine)
+                spine.set_clip_box(None)
+            if legend is not None and set(hit) <= set(run) and hit:
+                self.ax.draw_artist(legend)
+        self.blit(Bbox.union([boxes[col] for col in columns]))
+        return True
 
 
     def clear(self):
         self.ax.clear()
+        self._layout = None
+        self._bars = []
+        self._heights = np.zeros((0, 0))
+        self._bottoms = np.zeros((0, 0))
+        self._invalidate()
+
+
+    def dispose(self):
+        # the figure and the canvas point to each other, break it explicitly
+        self.mpl_disconnect(self._resize_cid)
+        self.clear()
+        self.fig.clear()
+        self.deleteLater()
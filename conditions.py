@@ -0,0 +1,152 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+
+# numeric road conditions fields aggregated over the stations
+NUMERIC_FIELDS = ("roadTemperature", "temperature", "windSpeed",
+                  "windDirection")
+# text fields summarized by their most common value
+TEXT_FIELDS = ("type", "reliability", "overallRoadCondition")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ConditionsSnapshot:
+    """
+    ConditionsSnapshot class for the road conditions of a bbox at one time.
+
+    Every forecast hour of every station of the road-conditions response is
+    indexed once, so any hour selection is answered from memory until the
+    snapshot expires.
+
+    Attributes
+    ----------
+    stations: list
+        The ids of the stations, in the order of the response.
+    expires: float
+        The time.monotonic() time after which the snapshot is stale.
+
+    Methods
+    -------
+    expired()
+        Returns True if the snapshot is stale and has to be fetched again.
+    hour(name)
+        Returns the conditions of every station for the forecast hour.
+    get(station, name)
+        Returns the conditions of the station for the forecast hour.
+    aggregate(name, precipitation=None, condition=None)
+        Returns the conditions of the forecast hour over the filtered stations.
+    """
+
+    def __init__(self, weather_data, ttl=60):
+        self.stations = []
+        self.expires = time.monotonic() + ttl
+        self._hours = {}
+        self._items = {}
+        self._columns = {}
+
+        for station in weather_data:
+            station_id = station.get("id")
+            self.stations.append(station_id)
+            for item in station.get("roadConditions") or ():
+                name = str(item.get("forecastName")).lower()
+                self._hours.setdefault(name, []).append(item)
+                self._items[(station_id, name)] = item
+
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+
+    def hour(self, name):
+        return self._hours.get(name.lower(), [])
+
+
+    def get(self, station, name):
+        return self._items.get((station, name.lower()))
+
+
+    def _hour_columns(self, name):
+        # the columns of an hour are built once, on its first aggregate
+        columns = self._columns.get(name)
+        if columns is None:
+            items = self.hour(name)
+            reasons = [item.get("forecastConditionReason") or {}
+                       for item in items]
+            columns = {
+                field: np.array([_to_float(item.get(field)) for item in items],
+                                dtype=float)
+                for field in NUMERIC_FIELDS
+            }
+            # missing reasons are empty strings, which no filter excludes
+            columns["precipitationCondition"] = np.array(
+                [r.get("precipitationCondition") or "" for r in reasons],
+                dtype=str)
+            columns["roadCondition"] = np.array(
+                [r.get("roadCondition") or "" for r in reasons], dtype=str)
+            self._columns[name] = columns
+        return columns
+
+
+    def aggregate(self, name, precipitation=None, condition=None):
+        """
+        Returns the conditions of the forecast hour over the filtered stations.
+
+        Parameters
+        ----------
+        name: str
+            The forecast hour, e.g. "2h".
+        precipitation: str, optional
+            The precipitation condition the stations must have.
+        condition: str, optional
+            The road condition the stations must have.
+
+        Returns
+        -------
+        dict
+            The dict with the number of "stations" that passed the filters,
+            the min/mean/max of every numeric field (the circular mean for the
+            wind direction) and the most common value of every text field.
+            Stations without a forecast condition reason pass the filters.
+        """
+        name = name.lower()
+        columns = self._hour_columns(name)
+        mask = np.ones(len(columns["roadCondition"]), dtype=bool)
+        if precipitation:
+            precip = columns["precipitationCondition"]
+            mask &= (precip == precipitation) | (precip == "")
+        if condition:
+            road = columns["roadCondition"]
+            mask &= (road == condition) | (road == "")
+
+        stats = {"stations": int(mask.sum())}
+        for field in NUMERIC_FIELDS:
+            values = columns[field][mask]
+            values = values[~np.isnan(values)]
+            if not len(values):
+                stats[field] = dict.fromkeys(("min", "mean", "max"))
+                continue
+            if field == "windDirection":
+                rad = np.radians(values)
+                mean = np.degrees(np.arctan2(np.sin(rad).mean(),
+                                             np.cos(rad).mean())) % 360
+            else:
+                mean = values.mean()
+            stats[field] = {
+                "min": float(values.min()),
+                "mean": round(float(mean), 1),
+                "max": float(values.max()),
+            }
+
+        items = [item for item, keep in zip(self.hour(name), mask) if keep]
+        for field in TEXT_FIELDS:
+            common = Counter(item.get(field) for item in items).most_common(1)
+            stats[field] = common[0][0] if common else None
+        return stats
@@ -0,0 +1,48 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# available JSON decoders, all of them take the raw response bytes
+BACKENDS = {"json": json.loads}
+if msgspec is not None:
+    BACKENDS["msgspec"] = msgspec.json.decode
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+
+def get_decoder(name=None):
+    """
+    Returns the JSON decoding function of the backend.
+
+    Parameters
+    ----------
+    name: str, optional
+        The name of the backend in BACKENDS. The fastest installed backend
+        (orjson, then msgspec, then the stdlib json) is used by default.
+
+    Raises
+    ------
+    ValueError
+        If the backend is not installed.
+    """
+    if name is None:
+        for name in ("orjson", "msgspec", "json"):
+            if name in BACKENDS:
+                break
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"JSON backend {name!r} is not installed") from None
+
+
+# decodes the response bytes directly, without a str round trip
+loads = get_decoder()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class DiskCache:
+    """
+    DiskCache class for keeping immutable query results on the local disk.
+
+    The results are stored in a SQLite database as zlib compressed JSON blobs
+    with a SHA-256 checksum, so they survive restarts. Entries are evicted in
+    least recently used order when the total size of the blobs is over the
+    limit, and entries that fail the checksum are dropped on read.
+
+    Attributes
+    ----------
+    path: str
+        The path of the SQLite database file.
+    max_bytes: int
+        The max total size in bytes of the compressed blobs.
+
+    Methods
+    -------
+    key(params)
+        Returns the normalized string key of the query parameters.
+    get(params)
+        Returns the stored result or None if it is missing or corrupted.
+    put(params, value)
+        Stores the result and evicts entries over the size limit.
+    close()
+        Closes the database connection.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = self._connect()
+
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            ok = conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        except sqlite3.DatabaseError:
+            ok = False
+        # a broken database file is only a cache, start over with a new one
+        if not ok:
+            conn.close()
+            os.remove(self.path)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " blob BLOB NOT NULL,"
+            " checksum TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        conn.commit()
+        return conn
+
+
+    @staticmethod
+    def key(params):
+        return json.dumps(params, sort_keys=True, default=str)
+
+
+    def get(self, params):
+        key = self.key(params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob, checksum FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            blob, checksum = row
+            try:
+                if hashlib.sha256(blob).hexdigest() != checksum:
+                    raise ValueError("checksum mismatch")
+                value = json.loads(zlib.decompress(blob))
+            except (ValueError, zlib.error):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+            return value
+
+
+    def put(self, params, value):
+        key = self.key(params)
+        blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, blob, hashlib.sha256(blob).hexdigest(), len(blob),
+                 time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+    def _evict(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        )
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,81 @@
+def compile_extractor(fields, defaults=None):
+    """
+    Compiles a field spec into a fast function that extracts a row from JSON.
+
+    Every field is a path of dict keys (str) and list indices (int) into the
+    decoded JSON object. The paths are merged into a tree, so a prefix shared
+    by several fields is walked only once, and the tree is compiled into a
+    single function of plain subscripts instead of a try/except per field.
+    A field whose path is missing or null gets its default value.
+
+    Parameters
+    ----------
+    fields: dict
+        The dict of field names and their paths, e.g.
+        {"road": ("properties", "roadAddress", "road")}.
+    defaults: dict, optional
+        The dict of default values of the fields, None if not given.
+
+    Returns
+    -------
+    function
+        The function that takes the JSON object and returns the dict of
+        fields.
+    """
+    defaults = defaults or {}
+
+    # tree of path steps, a leaf lists the fields that end at the node
+    tree = {}
+    for name, path in fields.items():
+        if not path:
+            raise ValueError(f"empty path for field {name!r}")
+        node = tree
+        for step in path:
+            if not isinstance(step, (str, int)):
+                raise TypeError(f"bad path step {step!r} for field {name!r}")
+            node = node.setdefault(step, {})
+        node.setdefault(None, []).append(name)
+
+    # every field starts as None and a step that fails skips only the fields
+    # below it, a try block is opened only where the paths branch, so each
+    # shared prefix is subscripted once and a missing one raises only once
+    lines = ["def extract(v0):"]
+    lines += [f"    r{i} = None" for i in range(len(fields))]
+    index = {name: i for i, name in enumerate(fields)}
+    counter = [0]
+
+    def emit(node, var, indent):
+        steps = [step for step in node if step is not None]
+        for name in node.get(None, ()):
+            lines.append(f"{indent}r{index[name]} = {var}")
+        for step in steps:
+            counter[0] += 1
+            out = f"v{counter[0]}"
+            if len(steps) > 1:
+                lines.append(f"{indent}try:")
+                lines.append(f"{indent}    {out} = {var}[{step!r}]")
+                emit(node[step], out, indent + "    ")
+                lines.append(f"{indent}except (KeyError, IndexError, TypeError):")
+                lines.append(f"{indent}    pass")
+            else:
+                lines.append(f"{indent}{out} = {var}[{step!r}]")
+                emit(node[step], out, indent)
+
+    lines.append("    try:")
+    emit(tree, "v0", "        ")
+    lines.append("    except (KeyError, IndexError, TypeError):")
+    lines.append("        pass")
+
+    consts = {}
+    items = []
+    for name, i in index.items():
+        if defaults.get(name) is None:
+            items.append(f"{name!r}: r{i}")
+        else:
+            consts[f"d{i}"] = defaults[name]
+            items.append(f"{name!r}: d{i} if r{i} is None else r{i}")
+    lines.append("    return {" + ", ".join(items) + "}")
+
+    namespace = dict(consts)
+    exec("\n".join(lines), namespace)
+    return namespace["extract"]
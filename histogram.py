@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class TaskHistogram:
+    """
+    TaskHistogram class for the number of maintenance tasks per day.
+
+    The routes are binned by the UTC day of their end time, the same time the
+    API filters the routes on, and every task of a route is counted once.
+    All the binning is done with NumPy on the whole set of routes at once.
+
+    Attributes
+    ----------
+    tasks: list
+        The task codes, indexed by the rows of counts.
+    days: numpy.ndarray
+        The datetime64[D] days, indexed by the columns of counts.
+    counts: numpy.ndarray
+        The task x day matrix of the number of routes.
+
+    Methods
+    -------
+    from_routes(end_times, tasks, start=None, end=None)
+        Returns the histogram of the routes.
+    from_days(days, start=None, end=None)
+        Returns the histogram of the dict of task counts per day.
+    to_days()
+        Returns the dict of task counts per day of non-empty days.
+    totals()
+        Returns the dict of task counts over the whole window.
+    """
+
+    def __init__(self, tasks, days, counts):
+        self.tasks = list(tasks)
+        self.days = days
+        self.counts = counts
+
+
+    @staticmethod
+    def _day_range(days, start, end):
+        # empty days inside the window get a zero column too
+        if start is not None:
+            first = np.datetime64(start, "D")
+        elif len(days):
+            first = days.min()
+        else:
+            return np.array([], dtype="datetime64[D]")
+        if end is not None:
+            # the window end is exclusive
+            last = np.datetime64(np.datetime64(end, "s") - 1, "D")
+        elif len(days):
+            last = days.max()
+        else:
+            last = first
+        return np.arange(first, last + 1, dtype="datetime64[D]")
+
+
+    @classmethod
+    def from_routes(cls, end_times, tasks, start=None, end=None):
+        """
+        Returns the histogram of the routes.
+
+        Parameters
+        ----------
+        end_times: list
+            The ISO 8601 UTC end times of the routes.
+        tasks: list
+            The lists of task codes of the routes.
+        start: datetime.datetime, optional
+            The start of the window, the first day with a route by default.
+        end: datetime.datetime, optional
+            The exclusive end of the window, the last day with a route by
+            default.
+        """
+        # one entry per task of every route, pointing back to its route
+        lengths = np.fromiter((len(t) for t in tasks), dtype=np.intp,
+                              count=len(tasks))
+        flat = [task for route in tasks for task in route]
+        route = np.repeat(np.arange(len(tasks)), lengths)
+
+        # seconds precision without the "Z", numpy does not parse time zones
+        ends = np.array([t[:19] for t in end_times], dtype="datetime64[s]")
+        route_days = ends.astype("datetime64[D]")
+        days = cls._day_range(route_days, start, end)
+
+        names, task_index = np.unique(np.array(flat, dtype=str),
+                                      return_inverse=True)
+        day_index = (route_days[route] - days[0]).astype(np.intp) \
+            if len(days) else np.zeros(0, dtype=np.intp)
+        inside = (day_index >= 0) & (day_index < len(days))
+
+        # bin (task, day) pairs at once by their flat matrix index
+        bins = task_index[inside] * len(days) + day_index[inside]
+        counts = np.bincount(bins, minlength=len(names) * len(days))
+        return cls(names.tolist(), days,
+                   counts.reshape(len(names), len(days)))
+
+
+    @classmethod
+    def from_days(cls, days, start=None, end=None):
+        """
+        Returns the histogram of the dict of task counts per day.
+
+        Parameters
+        ----------
+        days: dict
+            The dict of ISO dates, each a dict of task codes and counts.
+        start: datetime.datetime, optional
+            The start of the window, the first day in days by default.
+        end: datetime.datetime, optional
+            The exclusive end of the window, the last day in days by default.
+        """
+        names = sorted({task for tasks in days.values() for task in tasks})
+        day_range = cls._day_range(
+            np.array(list(days), dtype="datetime64[D]"), start, end)
+        counts = np.zeros((len(names), len(day_range)), dtype=np.intp)
+
+        rows = {task: i for i, task in enumerate(names)}
+        for day, tasks in days.items():
+            col = int((np.datetime64(day, "D") - day_range[0]).astype(np.intp))
+            if not 0 <= col < len(day_range):
+                continue
+            for task, count in tasks.items():
+                counts[rows[task], col] += count
+        return cls(names, day_range, counts)
+
+
+    def to_days(self):
+        days = {}
+        for col in np.flatnonzero(self.counts.any(axis=0)):
+            rows = np.flatnonzero(self.counts[:, col])
+            days[str(self.days[col])] = {
+                self.tasks[row]: int(self.counts[row, col]) for row in rows
+            }
+        return days
+
+
+    def totals(self):
+        return dict(zip(self.tasks, self.counts.sum(axis=1).tolist()))
+
+
+    def __len__(self):
+        return len(self.tasks)
@@ -12,7 +12,15 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 
 
 class Ui_MainWindow(object):
-    def setupUi(self, MainWindow):
+    # the pages of the stacked widget, each built by its setup_<page> method
+    PAGES = ('main_page', 'cond_page', 'msg_page', 'comb_page')
+
+    def setupUi(self, MainWindow, pages=PAGES):
+        self._main_window = MainWindow
+        self.main_page = None
+        self.cond_page = None
+        self.msg_page = None
+        self.comb_page = None
         MainWindow.setObjectName("MainWindow")
         MainWindow.resize(1080, 860)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
@@ -184,6 +192,32 @@ class Ui_MainWindow(object):
         self.stacked_widget.setFont(font)
         self.stacked_widget.setLineWidth(0)
         self.stacked_widget.setObjectName("stacked_widget")
+        self.horizontalLayout_6.addWidget(self.stacked_widget)
+        self.horizontalLayout_2.addWidget(self.pages)
+        self.verticalLayout.addWidget(self.body)
+        self.horizontalLayout_20.addWidget(self.container)
+        MainWindow.setCentralWidget(self.centralwidget)
+
+        for page in pages:
+            getattr(self, "setup_" + page)(MainWindow)
+        self.retranslateUi(MainWindow)
+        self.stacked_widget.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def setup_page(self, name):
+        # builds the page the first time it is needed, True if built now
+        if getattr(self, name) is not None:
+            return False
+        getattr(self, "setup_" + name)(self._main_window)
+        getattr(self, "retranslate_" + name)(self._main_window)
+        return True
+
+    def _page_index(self, name):
+        # a page built later still goes to its place in the designer order
+        return sum(getattr(self, page) is not None
+                   for page in self.PAGES[:self.PAGES.index(name)])
+
+    def setup_main_page(self, MainWindow):
         self.main_page = QtWidgets.QWidget()
         self.main_page.setObjectName("main_page")
         self.horizontalLayout_7 = QtWidgets.QHBoxLayout(self.main_page)
@@ -358,7 +392,10 @@ class Ui_MainWindow(object):
         self.horizontalLayout_5.addWidget(self.stacked_widget_1)
         self.verticalLayout_2.addWidget(self.results_frame)
         self.horizontalLayout_7.addWidget(self.page_body)
-        self.stacked_widget.addWidget(self.main_page)
+        self.stacked_widget.insertWidget(self._page_index('main_page'), self.main_page)
+        self.stacked_widget_1.setCurrentIndex(0)
+
+    def setup_cond_page(self, MainWindow):
         self.cond_page = QtWidgets.QWidget()
         self.cond_page.setObjectName("cond_page")
         self.horizontalLayout_10 = QtWidgets.QHBoxLayout(self.cond_page)
@@ -791,7 +828,10 @@ class Ui_MainWindow(object):
         self.horizontalLayout_9.addWidget(self.stacked_widget_2)
         self.verticalLayout_4.addWidget(self.results_frame_2)
         self.horizontalLayout_10.addWidget(self.page_body_2)
-        self.stacked_widget.addWidget(self.cond_page)
+        self.stacked_widget.insertWidget(self._page_index('cond_page'), self.cond_page)
+        self.stacked_widget_2.setCurrentIndex(0)
+
+    def setup_msg_page(self, MainWindow):
         self.msg_page = QtWidgets.QWidget()
         self.msg_page.setObjectName("msg_page")
         self.horizontalLayout_13 = QtWidgets.QHBoxLayout(self.msg_page)
@@ -909,7 +949,7 @@ class Ui_MainWindow(object):
         self.horizontalLayout.setContentsMargins(15, 15, 15, 15)
         self.horizontalLayout.setSpacing(0)
         self.horizontalLayout.setObjectName("horizontalLayout")
-        self.tableWidget = QtWidgets.QTableWidget(self.results_page_3)
+        self.tableWidget = QtWidgets.QTableView(self.results_page_3)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -927,48 +967,6 @@ class Ui_MainWindow(object):
         self.tableWidget.setGridStyle(QtCore.Qt.NoPen)
         self.tableWidget.setCornerButtonEnabled(False)
         self.tableWidget.setObjectName("tableWidget")
-        self.tableWidget.setColumnCount(4)
-        self.tableWidget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(10)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(10)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(10)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(10)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget.setHorizontalHeaderItem(3, item)
         self.tableWidget.horizontalHeader().setCascadingSectionResizes(True)
         self.tableWidget.horizontalHeader().setDefaultSectionSize(140)
         self.tableWidget.horizontalHeader().setMinimumSectionSize(40)
@@ -983,7 +981,10 @@ class Ui_MainWindow(object):
         self.verticalLayout_11.addWidget(self.frame1)
         self.verticalLayout_9.addWidget(self.results_frame_3)
         self.horizontalLayout_13.addWidget(self.page_body_3)
-        self.stacked_widget.addWidget(self.msg_page)
+        self.stacked_widget.insertWidget(self._page_index('msg_page'), self.msg_page)
+        self.stacked_widget_3.setCurrentIndex(0)
+
+    def setup_comb_page(self, MainWindow):
         self.comb_page = QtWidgets.QWidget()
         self.comb_page.setObjectName("comb_page")
         self.horizontalLayout_21 = QtWidgets.QHBoxLayout(self.comb_page)
@@ -1644,7 +1645,7 @@ class Ui_MainWindow(object):
         self.verticalLayout_33.setContentsMargins(10, 10, 10, 10)
         self.verticalLayout_33.setSpacing(10)
         self.verticalLayout_33.setObjectName("verticalLayout_33")
-        self.tableWidget_2 = QtWidgets.QTableWidget(self.results_widget_4)
+        self.tableWidget_2 = QtWidgets.QTableView(self.results_widget_4)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Preferred)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -1660,48 +1661,6 @@ class Ui_MainWindow(object):
         self.tableWidget_2.setGridStyle(QtCore.Qt.NoPen)
         self.tableWidget_2.setCornerButtonEnabled(False)
         self.tableWidget_2.setObjectName("tableWidget_2")
-        self.tableWidget_2.setColumnCount(4)
-        self.tableWidget_2.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(8)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget_2.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(8)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget_2.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(8)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget_2.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        item.setTextAlignment(QtCore.Qt.AlignCenter)
-        font = QtGui.QFont()
-        font.setFamily("Mulish")
-        font.setPointSize(8)
-        font.setBold(True)
-        font.setWeight(75)
-        item.setFont(font)
-        item.setBackground(QtGui.QColor(247, 247, 252))
-        self.tableWidget_2.setHorizontalHeaderItem(3, item)
         self.tableWidget_2.horizontalHeader().setCascadingSectionResizes(True)
         self.tableWidget_2.horizontalHeader().setDefaultSectionSize(140)
         self.tableWidget_2.horizontalHeader().setMinimumSectionSize(40)
@@ -1719,20 +1678,8 @@ class Ui_MainWindow(object):
         self.horizontalLayout_18.addWidget(self.stacked_widget_4)
         self.verticalLayout_19.addWidget(self.results_frame_4)
         self.horizontalLayout_21.addWidget(self.page_body_4)
-        self.stacked_widget.addWidget(self.comb_page)
-        self.horizontalLayout_6.addWidget(self.stacked_widget)
-        self.horizontalLayout_2.addWidget(self.pages)
-        self.verticalLayout.addWidget(self.body)
-        self.horizontalLayout_20.addWidget(self.container)
-        MainWindow.setCentralWidget(self.centralwidget)
-
-        self.retranslateUi(MainWindow)
-        self.stacked_widget.setCurrentIndex(0)
-        self.stacked_widget_1.setCurrentIndex(0)
-        self.stacked_widget_2.setCurrentIndex(0)
-        self.stacked_widget_3.setCurrentIndex(0)
+        self.stacked_widget.insertWidget(self._page_index('comb_page'), self.comb_page)
         self.stacked_widget_4.setCurrentIndex(0)
-        QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
     def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
@@ -1742,6 +1689,12 @@ class Ui_MainWindow(object):
         self.cond_button.setText(_translate("MainWindow", "   Road Conditions     "))
         self.msg_button.setText(_translate("MainWindow", "   Traffic Messages     "))
         self.comb_button.setText(_translate("MainWindow", "   Combined Report   "))
+        for page in self.PAGES:
+            if getattr(self, page) is not None:
+                getattr(self, "retranslate_" + page)(MainWindow)
+
+    def retranslate_main_page(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
         self.title_label.setText(_translate("MainWindow", "Search Options"))
         self.form_label_1.setText(_translate("MainWindow", "Location"))
         self.main_input_1.setItemText(0, _translate("MainWindow", "Helsinki"))
@@ -1752,6 +1705,9 @@ class Ui_MainWindow(object):
         self.form_label_2.setText(_translate("MainWindow", "Start Date and Time"))
         self.form_label_3.setText(_translate("MainWindow", "End Date and Time"))
         self.main_submit_btn.setText(_translate("MainWindow", "Show Tasks"))
+
+    def retranslate_cond_page(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
         self.title_label_2.setText(_translate("MainWindow", "Search Options"))
         self.form_label_5.setText(_translate("MainWindow", "Precipitation Condition"))
         self.cond_input_2.setItemText(0, _translate("MainWindow", "NO_RAIN_DRY_WEATHER"))
@@ -1783,6 +1739,9 @@ class Ui_MainWindow(object):
         self.cond_data_6.setText(_translate("MainWindow", "SUCCESSFUL"))
         self.label_4.setText(_translate("MainWindow", "Wind Direction"))
         self.cond_data_4.setText(_translate("MainWindow", "134"))
+
+    def retranslate_msg_page(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
         self.title_label_3.setText(_translate("MainWindow", "Search Options"))
         self.form_label_8.setText(_translate("MainWindow", "Message Type"))
         self.msg_input.setItemText(0, _translate("MainWindow", "TRAFFIC_ANNOUNCEMENT"))
@@ -1790,14 +1749,9 @@ class Ui_MainWindow(object):
         self.msg_input.setItemText(2, _translate("MainWindow", "WEIGHT_RESTRICTION"))
         self.msg_input.setItemText(3, _translate("MainWindow", "ROAD_WORK"))
         self.msg_submit_btn.setText(_translate("MainWindow", "Search"))
-        item = self.tableWidget.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Country Code"))
-        item = self.tableWidget.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Municipality"))
-        item = self.tableWidget.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Road"))
-        item = self.tableWidget.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Description"))
+
+    def retranslate_comb_page(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
         self.title_label_4.setText(_translate("MainWindow", "Search Options"))
         self.label_20.setText(_translate("MainWindow", "Location"))
         self.comb_input_1.setCurrentText(_translate("MainWindow", "Helsinki"))
@@ -1836,14 +1790,6 @@ class Ui_MainWindow(object):
         self.cond_data_12.setText(_translate("MainWindow", "SUCCESSFUL"))
         self.label_16.setText(_translate("MainWindow", "Road Maintainance"))
         self.label_15.setText(_translate("MainWindow", "Traffic Messages"))
-        item = self.tableWidget_2.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Country Code"))
-        item = self.tableWidget_2.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Municipality"))
-        item = self.tableWidget_2.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Road"))
-        item = self.tableWidget_2.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Description"))
 import resources_rc
 
 
@@ -0,0 +1,88 @@
+import codecs
+import json
+import re
+
+
+# start of the features array of a GeoJSON FeatureCollection
+FEATURES_START = re.compile(r'"features"\s*:\s*\[')
+WHITESPACE = " \t\n\r"
+
+
+def iter_features(chunks):
+    """
+    Yields the features of a GeoJSON FeatureCollection one at a time.
+
+    The response body is read chunk by chunk and only the feature currently
+    being decoded is kept in memory, so the peak memory use does not grow with
+    the number of features in the collection.
+
+    Parameters
+    ----------
+    chunks: iterable
+        The iterable of bytes chunks of the response body.
+
+    Raises
+    ------
+    KeyError
+        If the document has no features array, like the API error responses.
+    ValueError
+        If the features array is not valid JSON or ends too early.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    eof = False
+
+    def read():
+        nonlocal buf, eof
+        try:
+            buf += text.decode(next(chunks))
+        except StopIteration:
+            buf += text.decode(b"", final=True)
+            eof = True
+
+    # skip everything before the features array
+    while True:
+        match = FEATURES_START.search(buf)
+        if match:
+            buf = buf[match.end():]
+            break
+        if eof:
+            raise KeyError("features")
+        # keep the tail in case the key is split between chunks
+        buf = buf[-32:]
+        read()
+
+    pos = 0
+    while True:
+        # skip separators between the features
+        while pos < len(buf) and (buf[pos] in WHITESPACE or buf[pos] == ","):
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("unterminated features array")
+            buf = ""
+            pos = 0
+            read()
+            continue
+        if buf[pos] == "]":
+            return
+
+        try:
+            feature, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # the feature continues in the next chunk
+            if eof:
+                raise
+            buf = buf[pos:]
+            pos = 0
+            read()
+            continue
+
+        yield feature
+        pos = end
+        # drop the decoded features from the buffer
+        if pos > 65536:
+            buf = buf[pos:]
+            pos = 0
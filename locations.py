@@ -0,0 +1,83 @@
+import json
+from collections.abc import Mapping
+
+from spatial import GridIndex
+
+
+class LocationRegistry(Mapping):
+    """
+    LocationRegistry class for the selectable locations and their bboxes.
+
+    The locations are loaded from a JSON data file, which build_locations.py
+    builds from the boundaries of the municipalities, the regions and the
+    contract areas, and kept in a GridIndex, so a point or an arbitrary bbox
+    is resolved to the locations it falls in without testing every location.
+    The registry is a mapping of location names to (xMin, yMin, xMax, yMax)
+    tuples in the order of the file.
+
+    Attributes
+    ----------
+    kinds: dict
+        The dict of the kind (city, region, contract area, ...) of every
+        location.
+
+    Methods
+    -------
+    load(path)
+        Returns the registry of the locations in the JSON file.
+    names()
+        Returns the list of location names in the order of the file.
+    find_point(x, y)
+        Returns the names of the locations that contain the point.
+    find_bbox(bbox)
+        Returns the names of the locations that intersect the bbox.
+    """
+
+    def __init__(self, locations=(), cell_size=0.5):
+        self._bboxes = {}
+        self.kinds = {}
+        self._index = GridIndex(cell_size)
+        for location in locations:
+            self.add(location["name"], location["bbox"],
+                     location.get("kind"))
+
+
+    @classmethod
+    def load(cls, path):
+        # the file is {"locations": [{"name", "bbox", "kind"}, ...]}
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["locations"])
+
+
+    def add(self, name, bbox, kind=None):
+        x_min, y_min, x_max, y_max = bbox
+        if x_min > x_max or y_min > y_max:
+            raise ValueError(f"bad bbox {bbox!r} for location {name!r}")
+        self._bboxes[name] = tuple(bbox)
+        self.kinds[name] = kind
+        self._index.insert(name, bbox)
+
+
+    def names(self):
+        return list(self._bboxes)
+
+
+    def find_point(self, x, y):
+        return self._index.query_point(x, y)
+
+
+    def find_bbox(self, bbox):
+        return self._index.query_bbox(bbox)
+
+
+    def __getitem__(self, name):
+        return self._bboxes[name]
+
+
+    def __iter__(self):
+        return iter(self._bboxes)
+
+
+    def __len__(self):
+        return len(self._bboxes)
@@ -0,0 +1,122 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+from messages import MessageTable
+
+
+class MessageTableModel(QAbstractTableModel):
+    """
+    MessageTableModel class for showing a traffic messages table in a view.
+
+    The cells are read from the columnar MessageTable only when the view asks
+    for them, so only the rows on screen are ever turned into strings and no
+    item object is kept per cell. A new table resets the model at once and a
+    sync change set is applied as row range signals.
+
+    Attributes
+    ----------
+    HEADERS: tuple
+        The header labels of the columns of MessageTable.COLUMNS.
+    table: messages.MessageTable
+        The table shown.
+
+    Methods
+    -------
+    set_table(table)
+        Shows the table instead of the current one.
+    apply(changes)
+        Shows the table of the change set by changing only its rows.
+    """
+
+    HEADERS = ("Country Code", "Municipality", "Road", "Description")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = MessageTable()
+        # rows the view knows of, differs from the table only during apply
+        self._count = 0
+        # (first, last) rows of the old table removed so far during apply
+        self._gone = []
+
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(MessageTable.COLUMNS)
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        if row >= self._count:
+            return None
+        row = self._old_row(row)
+        if row >= len(self.table):
+            return None
+        return str(self.table.value(row, MessageTable.COLUMNS[index.column()]))
+
+
+    def _old_row(self, row):
+        # the view row in the old table, skipping the ranges removed so far
+        for first, last in self._gone:
+            if row < first:
+                break
+            row += last - first + 1
+        return row
+
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            return QColor(247, 247, 252)
+        return None
+
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self.table = table
+        self._count = len(table)
+        self.endResetModel()
+
+
+    def apply(self, changes):
+        # the removed rows come last first, so the rows before them keep
+        # their numbers while every range is removed, and the old table is
+        # shown until the view has the rows of the new one
+        for first, last in _ranges(changes.removed):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._count -= last - first + 1
+            self._gone.insert(0, (first, last))
+            self.endRemoveRows()
+        self._gone = []
+        self.table = changes.table
+
+        for first, last in _ranges(changes.updated):
+            self.dataChanged.emit(self.index(first, 0),
+                                  self.index(last, self.columnCount() - 1),
+                                  [Qt.DisplayRole])
+
+        if len(self.table) > self._count:
+            self.beginInsertRows(QModelIndex(), self._count,
+                                 len(self.table) - 1)
+            self._count = len(self.table)
+            self.endInsertRows()
+
+
+def _ranges(rows):
+    # (first, last) runs of consecutive rows, in the order of the rows
+    runs = []
+    for row in rows:
+        if runs and abs(row - runs[-1][1]) == 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return [(min(run), max(run)) for run in runs]
@@ -0,0 +1,428 @@
+import threading
+import time
+from array import array
+
+
+class Categorical:
+    """
+    Categorical class for a column of a few distinct repeating values.
+
+    Every distinct value is stored only once and the rows keep its integer
+    code, so a column of thousands of "FI" strings costs 4 bytes per row.
+
+    Attributes
+    ----------
+    codes: array.array
+        The code of the value of every row.
+    categories: list
+        The distinct values, indexed by their code.
+
+    Methods
+    -------
+    append(value)
+        Adds a row with the value.
+    set(i, value)
+        Changes the value of the row.
+    take(rows)
+        Keeps only the rows, in the given order.
+    copy()
+        Returns a copy of the column.
+    """
+
+    def __init__(self):
+        self.codes = array("I")
+        self.categories = []
+        self._index = {}
+
+
+    def _code(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.categories)
+            self._index[value] = code
+            self.categories.append(value)
+        return code
+
+
+    def append(self, value):
+        self.codes.append(self._code(value))
+
+
+    def set(self, i, value):
+        self.codes[i] = self._code(value)
+
+
+    def take(self, rows):
+        codes = self.codes
+        self.codes = array("I", [codes[i] for i in rows])
+
+
+    def copy(self):
+        column = Categorical()
+        column.codes = array("I", self.codes)
+        column.categories = list(self.categories)
+        column._index = dict(self._index)
+        return column
+
+
+    def __len__(self):
+        return len(self.codes)
+
+
+    def __getitem__(self, i):
+        return self.categories[self.codes[i]]
+
+
+class ChangeSet:
+    """
+    ChangeSet class for the rows changed by one traffic messages sync.
+
+    The changes turn the base table into the new table when done in order:
+    the removed rows are deleted from the base table, the updated rows are
+    then changed in place and the inserted rows are added at the end.
+
+    Attributes
+    ----------
+    base: messages.MessageTable
+        The table before the sync, None if there was none.
+    table: messages.MessageTable
+        The table after the sync.
+    removed: list
+        The rows of the base table that expired, in descending order.
+    updated: list
+        The rows, numbered after the removals, that got a new version.
+    inserted: list
+        The rows of the new situations, at the end of the new table.
+    """
+
+    def __init__(self, base, table, removed=(), updated=(), inserted=()):
+        self.base = base
+        self.table = table
+        self.removed = sorted(removed, reverse=True)
+        self.updated = sorted(updated)
+        self.inserted = sorted(inserted)
+
+
+    def __bool__(self):
+        return bool(self.removed or self.updated or self.inserted)
+
+
+    def __repr__(self):
+        return (f"ChangeSet(removed={len(self.removed)}, "
+                f"updated={len(self.updated)}, "
+                f"inserted={len(self.inserted)})")
+
+
+class MessageTable:
+    """
+    MessageTable class for storing the traffic messages data column by column.
+
+    The country codes and municipalities are categorical columns, the road
+    numbers are an integer array (-1 for a missing road) and only the
+    descriptions are kept as separate strings. The rows are still returned as
+    dicts, so the table is used like the list of dicts it replaces.
+
+    Every message keeps the names of the locations of the LocationRegistry
+    it falls in, resolved once when the message is added or updated, so the
+    messages of a location are found without scanning the whole table. The
+    messages with no location are in every location, they are shown rather
+    than lost.
+
+    Every row is a situation with its id and version, so a sync changes only
+    the rows of the situations that are new, updated or expired.
+
+    Attributes
+    ----------
+    COLUMNS: tuple
+        The names of the columns, in the order of the messages tables.
+
+    Methods
+    -------
+    append(row, locations=None, situation_id=None, version=None)
+        Adds the row dict and the names of its locations to the table.
+    extend(rows)
+        Adds all the row dicts to the table.
+    value(i, name)
+        Returns the value of the column of the row without building the row.
+    locations(i)
+        Returns the tuple of the location names of the row, None if unknown.
+    versions()
+        Returns the dict of the situation ids and versions of the rows.
+    version(situation_id)
+        Returns the version of the situation, None if it is not in the table.
+    located_in(location)
+        Returns the table of the messages in the location and of the
+        messages with no location.
+    copy()
+        Returns a copy of the table.
+    apply(upserts, removed)
+        Adds or updates the upserted situations and removes the expired ones.
+    nbytes()
+        Returns the approximate size of the table in bytes.
+    """
+
+    COLUMNS = ("countryCode", "municipality", "road", "description")
+
+    def __init__(self, rows=()):
+        self._country = Categorical()
+        self._municipality = Categorical()
+        self._road = array("l")
+        self._description = []
+        # location names of every row, None if unknown
+        self._locations = []
+        self._ids = []
+        # situation id: [row, version]
+        self._rows = {}
+        # location name: situation ids, so the rows can move without
+        # updating it
+        self._located = {}
+        self._unlocated = set()
+        self._serial = 0
+        self.extend(rows)
+
+
+    @staticmethod
+    def _road_number(row):
+        try:
+            return int(row.get("road"))
+        except (TypeError, ValueError):
+            return -1
+
+
+    def append(self, row, locations=None, situation_id=None, version=None):
+        if situation_id is None:
+            # rows without an id still need a unique key
+            situation_id = ("row", self._serial)
+            self._serial += 1
+        self._rows[situation_id] = [len(self._ids), version]
+        self._ids.append(situation_id)
+
+        self._country.append(row.get("countryCode"))
+        self._municipality.append(row.get("municipality"))
+        self._road.append(self._road_number(row))
+        self._description.append(row.get("description"))
+
+        self._locations.append(None)
+        self._locate(len(self._ids) - 1, situation_id, locations)
+
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+
+    def _unlocate(self, i, situation_id):
+        self._unlocated.discard(situation_id)
+        for name in self._locations[i] or ():
+            ids = self._located[name]
+            ids.discard(situation_id)
+            if not ids:
+                del self._located[name]
+
+
+    def _locate(self, i, situation_id, locations):
+        self._unlocate(i, situation_id)
+        if locations is None:
+            self._unlocated.add(situation_id)
+        else:
+            locations = tuple(locations)
+            for name in locations:
+                self._located.setdefault(name, set()).add(situation_id)
+        self._locations[i] = locations
+
+
+    def _set(self, i, row, locations, version):
+        situation_id = self._ids[i]
+        self._rows[situation_id][1] = version
+
+        self._country.set(i, row.get("countryCode"))
+        self._municipality.set(i, row.get("municipality"))
+        self._road[i] = self._road_number(row)
+        self._description[i] = row.get("description")
+        self._locate(i, situation_id, locations)
+
+
+    def _remove(self, rows):
+        for i in rows:
+            situation_id = self._ids[i]
+            del self._rows[situation_id]
+            self._unlocate(i, situation_id)
+
+        # compact every column at once and renumber the rows that are left
+        removed = set(rows)
+        keep = [i for i in range(len(self)) if i not in removed]
+        self._country.take(keep)
+        self._municipality.take(keep)
+        self._road = array("l", [self._road[i] for i in keep])
+        self._description = [self._description[i] for i in keep]
+        self._locations = [self._locations[i] for i in keep]
+        self._ids = [self._ids[i] for i in keep]
+        for row, situation_id in enumerate(self._ids):
+            self._rows[situation_id][0] = row
+
+
+    def value(self, i, name):
+        if name == "countryCode":
+            return self._country[i]
+        if name == "municipality":
+            return self._municipality[i]
+        if name == "road":
+            road = self._road[i]
+            return None if road < 0 else road
+        if name == "description":
+            return self._description[i]
+        raise KeyError(name)
+
+
+    def locations(self, i):
+        return self._locations[i]
+
+
+    def versions(self):
+        return {situation_id: self._rows[situation_id][1]
+                for situation_id in self._ids}
+
+
+    def version(self, situation_id):
+        entry = self._rows.get(situation_id)
+        return None if entry is None else entry[1]
+
+
+    def located_in(self, location):
+        table = MessageTable()
+        found = self._located.get(location, set()) | self._unlocated
+        rows = sorted(self._rows[situation_id][0] for situation_id in found)
+        for i in rows:
+            situation_id = self._ids[i]
+            table.append(self[i], self._locations[i], situation_id,
+                         self._rows[situation_id][1])
+        return table
+
+
+    def copy(self):
+        # the values are immutable, only the containers are copied
+        table = MessageTable()
+        table._country = self._country.copy()
+        table._municipality = self._municipality.copy()
+        table._road = array("l", self._road)
+        table._description = list(self._description)
+        table._locations = list(self._locations)
+        table._ids = list(self._ids)
+        table._rows = {key: list(entry) for key, entry in self._rows.items()}
+        table._located = {name: set(ids)
+                          for name, ids in self._located.items()}
+        table._unlocated = set(self._unlocated)
+        table._serial = self._serial
+        return table
+
+
+    def apply(self, upserts, removed):
+        """
+        Adds or updates the upserted situations and removes the expired ones.
+
+        Parameters
+        ----------
+        upserts: iterable
+            The (situation_id, version, row, locations) of every situation that
+            is new or has a new version.
+        removed: iterable
+            The ids of the situations that expired.
+
+        Returns
+        -------
+        messages.ChangeSet
+            The rows that were changed, with this table as the new table.
+        """
+        removed_rows = [self._rows[situation_id][0]
+                        for situation_id in removed
+                        if situation_id in self._rows]
+        if removed_rows:
+            self._remove(removed_rows)
+
+        updated = []
+        inserted = []
+        for situation_id, version, row, locations in upserts:
+            entry = self._rows.get(situation_id)
+            if entry is None:
+                inserted.append(len(self))
+                self.append(row, locations, situation_id, version)
+            else:
+                updated.append(entry[0])
+                self._set(entry[0], row, locations, version)
+        return ChangeSet(None, self, removed_rows, updated, inserted)
+
+
+    def nbytes(self):
+        # codes, road array and location tuples plus the description strings
+        return (len(self) * 40
+                + sum(len(d) for d in self._description if d)
+                + sum(len(str(c)) for c in self._country.categories)
+                + sum(len(str(m)) for m in self._municipality.categories))
+
+
+    def __len__(self):
+        return len(self._road)
+
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return {name: self.value(i, name) for name in self.COLUMNS}
+
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class MessageStore:
+    """
+    MessageStore class for the traffic messages tables of every situation type.
+
+    The store is shared by the background sweep that refreshes all the
+    situation types and by the queries of the GUI, so switching the type
+    shown is answered from memory while the tables are fresh. A stored table
+    is never changed, a sync stores a changed copy instead, so the GUI keeps
+    reading the table it shows while the sync runs in another thread.
+
+    Methods
+    -------
+    put(situation_type, table)
+        Stores the table of the situation type as fetched now.
+    get(situation_type, max_age=None)
+        Returns the table of the situation type or None if it is missing or
+        older than max_age seconds.
+    age(situation_type)
+        Returns the age of the table in seconds, None if it is missing.
+    """
+
+    def __init__(self):
+        # situation type: (fetch time, table)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+
+    def put(self, situation_type, table):
+        with self._lock:
+            self._tables[situation_type] = (time.monotonic(), table)
+
+
+    def get(self, situation_type, max_age=None):
+        with self._lock:
+            entry = self._tables.get(situation_type)
+        if entry is None:
+            return None
+        fetched, table = entry
+        if max_age is not None and time.monotonic() - fetched > max_age:
+            return None
+        return table
+
+
+    def age(self, situation_type):
+        with self._lock:
+            entry = self._tables.get(situation_type)
+        if entry is None:
+            return None
+        return time.monotonic() - entry[0]
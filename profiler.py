@@ -0,0 +1,122 @@
+"""
+Startup profiler of the app.
+
+Records a timeline of the startup phases (imports, resources, style sheet,
+UI setup, canvases) and writes it as a JSON report. It is off by default and
+every phase then costs one function call. It is turned on by the command
+line or the environment:
+
+    python app_controller.py --profile-startup[=report.json] [--profile-exit]
+    TRAFFICO_PROFILE=report.json TRAFFICO_PROFILE_EXIT=1 python app_controller.py
+
+The report goes to startup-profile.json by default. With the exit option the
+app quits once the report is written, so it also runs headless with
+QT_QPA_PLATFORM=offscreen, e.g. to track startup regressions in CI.
+"""
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+
+FLAG = "--profile-startup"
+EXIT_FLAG = "--profile-exit"
+ENV = "TRAFFICO_PROFILE"
+EXIT_ENV = "TRAFFICO_PROFILE_EXIT"
+DEFAULT_PATH = "startup-profile.json"
+
+# the timeline starts when the profiler is imported, as early as possible
+_start = time.perf_counter()
+_started = datetime.now(timezone.utc)
+_events = []
+_lock = threading.Lock()
+
+
+def _options(argv, environ):
+    path = environ.get(ENV) or None
+    for arg in argv[1:]:
+        if arg == FLAG:
+            path = path or DEFAULT_PATH
+        elif arg.startswith(FLAG + "="):
+            path = arg.split("=", 1)[1] or DEFAULT_PATH
+    exit_after = EXIT_FLAG in argv or environ.get(EXIT_ENV, "") not in ("", "0")
+    return path, exit_after
+
+
+path, exit_after = _options(sys.argv, os.environ)
+enabled = path is not None
+
+
+def _ms(t):
+    return round((t - _start) * 1000, 3)
+
+
+def _record(name, start, end):
+    event = {
+        "name": name,
+        "start_ms": _ms(start),
+        "end_ms": _ms(end),
+        "duration_ms": round((end - start) * 1000, 3),
+        "thread": threading.current_thread().name,
+    }
+    with _lock:
+        _events.append(event)
+
+
+@contextlib.contextmanager
+def _phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter())
+
+
+def phase(name):
+    """
+    Returns the context manager that records the block as a startup phase.
+    """
+    if not enabled:
+        return contextlib.nullcontext()
+    return _phase(name)
+
+
+def mark(name):
+    """
+    Records a point of the startup, e.g. the first paint.
+    """
+    if enabled:
+        now = time.perf_counter()
+        _record(name, now, now)
+
+
+def report():
+    """
+    Returns the dict of the timeline recorded so far.
+    """
+    with _lock:
+        events = sorted(_events, key=lambda event: event["start_ms"])
+    return {
+        "version": 1,
+        "started": _started.isoformat(),
+        "total_ms": _ms(time.perf_counter()),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+        "argv": sys.argv,
+        "phases": events,
+    }
+
+
+def write(to=None):
+    """
+    Writes the report as JSON to the path of the options and returns it.
+    """
+    to = to or path or DEFAULT_PATH
+    with open(to, "w", encoding="utf-8") as f:
+        json.dump(report(), f, indent=2)
+    return to
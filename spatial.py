@@ -0,0 +1,146 @@
+import math
+
+
+class GridIndex:
+    """
+    GridIndex class for finding bounding boxes by a point or another box.
+
+    The plane is split into square cells and every box is stored in all the
+    cells it overlaps, so a lookup only tests the few boxes of the cells the
+    query touches instead of every box in the index.
+
+    Attributes
+    ----------
+    cell_size: float
+        The width and height of a cell in degrees.
+
+    Methods
+    -------
+    insert(key, bbox)
+        Adds the key with its (xMin, yMin, xMax, yMax) bounding box.
+    remove(key)
+        Removes the key from the index.
+    query_point(x, y)
+        Returns the keys whose box contains the point.
+    query_bbox(bbox)
+        Returns the keys whose box intersects the bounding box.
+    copy()
+        Returns a copy of the index.
+    """
+
+    def __init__(self, cell_size=0.5):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._boxes = {}
+
+
+    def _cell_range(self, bbox):
+        x_min, y_min, x_max, y_max = bbox
+        size = self.cell_size
+        for ix in range(math.floor(x_min / size), math.floor(x_max / size) + 1):
+            for iy in range(math.floor(y_min / size),
+                            math.floor(y_max / size) + 1):
+                yield ix, iy
+
+
+    def insert(self, key, bbox):
+        if key in self._boxes:
+            self.remove(key)
+        bbox = tuple(bbox)
+        self._boxes[key] = bbox
+        for cell in self._cell_range(bbox):
+            self._cells.setdefault(cell, []).append(key)
+
+
+    def remove(self, key):
+        bbox = self._boxes.pop(key)
+        for cell in self._cell_range(bbox):
+            keys = self._cells[cell]
+            keys.remove(key)
+            if not keys:
+                del self._cells[cell]
+
+
+    def query_point(self, x, y):
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        return [
+            key for key in self._cells.get(cell, ())
+            if self._boxes[key][0] <= x <= self._boxes[key][2]
+            and self._boxes[key][1] <= y <= self._boxes[key][3]
+        ]
+
+
+    def query_bbox(self, bbox):
+        x_min, y_min, x_max, y_max = bbox
+        found = {}
+        for cell in self._cell_range(bbox):
+            for key in self._cells.get(cell, ()):
+                if key in found:
+                    continue
+                box = self._boxes[key]
+                if (box[0] <= x_max and x_min <= box[2]
+                        and box[1] <= y_max and y_min <= box[3]):
+                    found[key] = None
+        return list(found)
+
+
+    def copy(self):
+        index = GridIndex(self.cell_size)
+        index._boxes = dict(self._boxes)
+        index._cells = {cell: list(keys) for cell, keys in self._cells.items()}
+        return index
+
+
+    def __len__(self):
+        return len(self._boxes)
+
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+
+def intersects(a, b):
+    """
+    Returns True if the (xMin, yMin, xMax, yMax) bounding boxes intersect.
+    """
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def union(boxes):
+    """
+    Returns the bounding box of the bounding boxes, None if there are none.
+    """
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def geometry_bbox(geometry):
+    """
+    Returns the bounding box of a GeoJSON geometry, None if it has no points.
+    """
+    if not geometry:
+        return None
+    if geometry.get("type") == "GeometryCollection":
+        return union([geometry_bbox(g)
+                      for g in geometry.get("geometries", ())])
+
+    # walk the nested coordinate lists down to the [x, y(, z)] positions
+    x_min = y_min = math.inf
+    x_max = y_max = -math.inf
+    stack = [geometry.get("coordinates") or ()]
+    while stack:
+        coords = stack.pop()
+        if coords and isinstance(coords[0], (int, float)):
+            x, y = coords[0], coords[1]
+            x_min = min(x_min, x)
+            y_min = min(y_min, y)
+            x_max = max(x_max, x)
+            y_max = max(y_max, y)
+        else:
+            stack.extend(coords)
+    if x_min > x_max:
+        return None
+    return (x_min, y_min, x_max, y_max)
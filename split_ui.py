@@ -0,0 +1,149 @@
+"""
+Splits the pyuic5 output of interface.ui into one setup method per page.
+
+pyuic5 builds every widget of all the pages of the stacked widget in one
+setupUi. This script moves the widgets of every page, with their texts and
+initial states, to setup_<page> and retranslate_<page> methods, so that the
+View can build only the landing page at startup and the other pages the
+first time they are shown. Run it after pyuic5, from the project root:
+
+    pyuic5 -x interface.ui -o interface.py
+    python split_ui.py interface.py
+"""
+import re
+import sys
+
+
+# the pages of the stacked widget, in their order in the designer
+PAGES = ("main_page", "cond_page", "msg_page", "comb_page")
+STACK = "stacked_widget"
+
+INDENT = " " * 8
+ASSIGNED = re.compile(r"^\s+self\.(\w+) = ")
+REFERENCED = re.compile(r"self\.(\w+)")
+
+HEADER = '''\
+    # the pages of the stacked widget, each built by its setup_<page> method
+    PAGES = {pages!r}
+'''
+
+DISPATCH = '''\
+
+    def setup_page(self, name):
+        # builds the page the first time it is needed, True if built now
+        if getattr(self, name) is not None:
+            return False
+        getattr(self, "setup_" + name)(self._main_window)
+        getattr(self, "retranslate_" + name)(self._main_window)
+        return True
+
+    def _page_index(self, name):
+        # a page built later still goes to its place in the designer order
+        return sum(getattr(self, page) is not None
+                   for page in self.PAGES[:self.PAGES.index(name)])
+'''
+
+
+def split(source):
+    lines = source.split("\n")
+    if any(line.strip().startswith("def setup_page(") for line in lines):
+        raise ValueError("the file is already split")
+
+    setup = lines.index("    def setupUi(self, MainWindow):")
+    retranslate = lines.index("    def retranslateUi(self, MainWindow):")
+    end = next(i for i in range(retranslate + 1, len(lines))
+               if lines[i] and not lines[i].startswith(" "))
+    body = lines[setup + 1:retranslate]
+    while not body[-1]:
+        body.pop()
+    texts = lines[retranslate + 2:end]
+
+    # the lines of every page, from its widget to its addWidget
+    blocks = {}
+    names = {}
+    for page in PAGES:
+        first = body.index(f"{INDENT}self.{page} = QtWidgets.QWidget()")
+        last = body.index(f"{INDENT}self.{STACK}.addWidget(self.{page})")
+        block = body[first:last + 1]
+        block[-1] = (f"{INDENT}self.{STACK}.insertWidget("
+                     f"self._page_index({page!r}), self.{page})")
+        blocks[page] = block
+        names[page] = {m.group(1) for m in map(ASSIGNED.match, block) if m}
+        body[first:last + 1] = [None]
+
+    def owner(statement):
+        used = set(REFERENCED.findall("\n".join(statement)))
+        for page in PAGES:
+            if used & names[page]:
+                return page
+        return None
+
+    # the initial states of the widgets of a page go with the page
+    shell = []
+    states = {page: [] for page in PAGES}
+    for line in body:
+        if line is None:
+            continue
+        page = owner([line]) if "setCurrentIndex" in line else None
+        (states[page] if page else shell).append(line)
+
+    # the texts, an "item = ..." statement continues on the "item." lines
+    statements = []
+    for line in texts:
+        if line.startswith(INDENT + "item.") and statements:
+            statements[-1].append(line)
+        else:
+            statements.append([line])
+    shell_texts = []
+    page_texts = {page: [] for page in PAGES}
+    for statement in statements:
+        page = owner(statement)
+        (page_texts[page] if page else shell_texts).extend(statement)
+
+    # the pages are built before the shell texts, like in pyuic5 output
+    at = shell.index(f"{INDENT}self.retranslateUi(MainWindow)")
+    shell[at:at] = [
+        f"{INDENT}for page in pages:",
+        f"{INDENT}    getattr(self, \"setup_\" + page)(MainWindow)",
+    ]
+    shell[0:0] = [f"{INDENT}self._main_window = MainWindow"] + [
+        f"{INDENT}self.{page} = None" for page in PAGES
+    ]
+
+    out = lines[:setup]
+    out += HEADER.format(pages=PAGES).split("\n")
+    out.append("    def setupUi(self, MainWindow, pages=PAGES):")
+    out += shell
+    out += DISPATCH.split("\n")
+    for page in PAGES:
+        out.append(f"    def setup_{page}(self, MainWindow):")
+        out += blocks[page] + states[page]
+        out.append("")
+    out.append(lines[retranslate])
+    out.append(lines[retranslate + 1])
+    out += shell_texts
+    out += [
+        f"{INDENT}for page in self.PAGES:",
+        f"{INDENT}    if getattr(self, page) is not None:",
+        f"{INDENT}        getattr(self, \"retranslate_\" + page)(MainWindow)",
+        "",
+    ]
+    for page in PAGES:
+        out.append(f"    def retranslate_{page}(self, MainWindow):")
+        out.append(lines[retranslate + 1])
+        out += page_texts[page]
+        out.append("")
+    out.pop()
+    out += lines[end:]
+    return "\n".join(out)
+
+
+def main(path="interface.py"):
+    with open(path, encoding="utf-8") as f:
+        source = split(f.read())
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
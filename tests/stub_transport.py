@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+def response(url, body, status=200, headers=None):
+    """
+    Returns a requests.Response with the body, read from memory.
+    """
+    res = requests.Response()
+    res.url = url
+    res.status_code = status
+    res.reason = requests.status_codes._codes.get(status, ("",))[0].upper()
+    res.headers = CaseInsensitiveDict(headers or {})
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    res._content = body
+    res._content_consumed = True
+    return res
+
+
+class StubTransport:
+    """
+    StubTransport class for answering the Model requests without a network.
+
+    Every request is answered by the handler function, which gets the path,
+    the query parameters (url and params merged, unquoted) and the request
+    headers, and returns the body or a (body, status, headers) tuple.
+
+    Attributes
+    ----------
+    handler: function
+        The function that answers the requests.
+    calls: list
+        The (path, query, headers) of every request.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+
+
+    def get(self, url, params=None, stream=False, headers=None):
+        parts = urlsplit(url)
+        query = {key: unquote(values[0]) for key, values
+                 in parse_qs(parts.query, keep_blank_values=True).items()}
+        query.update({key: str(value) for key, value in (params or {}).items()})
+        self.calls.append((parts.path, query, dict(headers or {})))
+
+        answer = self.handler(parts.path, query, headers or {})
+        if not isinstance(answer, tuple):
+            answer = (answer,)
+        return response(url, *answer)
+
+
+    def warm(self):
+        pass
+
+
+    def close(self):
+        pass
+
+
+def make_model(handler, home):
+    """
+    Returns a Model whose requests are answered by the handler, with its disk
+    cache in the home directory.
+    """
+    # imported here, so the stub itself does not need the app modules
+    import app_model
+
+    transport = StubTransport(handler)
+    with mock.patch.dict("os.environ", {"HOME": home}), \
+            mock.patch.object(app_model, "Transport",
+                              lambda *args, **kwargs: transport):
+        return app_model.Model()
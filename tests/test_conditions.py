@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+
+import requests
+
+from tests.stub_transport import make_model
+
+
+INPUTS = {
+    "location": "Helsinki",
+    "hour": "2h",
+    "precipitation": "",
+    "condition": "",
+}
+
+
+def station(station_id, temperature):
+    return {
+        "id": station_id,
+        "roadConditions": [{
+            "forecastName": "2h",
+            "roadTemperature": str(temperature),
+            "temperature": "1.5",
+            "windSpeed": 3.0,
+            "windDirection": 180,
+            "overallRoadCondition": "NORMAL_CONDITION",
+        }],
+    }
+
+
+class ConditionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.failing = set()
+        self.model = make_model(self.handle, self.home.name)
+
+
+    def tearDown(self):
+        self.home.cleanup()
+
+
+    def handle(self, path, query, headers):
+        # the path ends with the xMin/yMin/xMax/yMax of the tile
+        x_min = int(float(path.split("/")[-4]))
+        if x_min in self.failing:
+            return {"message": "Service unavailable"}, 503
+        return {"weatherData": [station(x_min, x_min - 20)]}
+
+
+    def test_stations_of_every_tile_are_aggregated(self):
+        # Helsinki spans the tiles of x 24 and 25
+        self.model.get_conditions_data(INPUTS)
+        self.assertEqual(self.model.conditions_stats["stations"], 2)
+        self.assertEqual(self.model.conditions_data["roadTemperature"], 4.5)
+
+
+    def test_failing_tile_fails_the_query(self):
+        self.failing = {25}
+        with self.assertRaises(requests.HTTPError):
+            self.model.get_conditions_data(INPUTS)
+        self.assertFalse(self.model.has_conditions_data(INPUTS))
+
+        # the failed tile is fetched again, the other one is cached
+        self.failing = set()
+        calls = len(self.model.transport.calls)
+        self.model.get_conditions_data(INPUTS)
+        self.assertEqual(len(self.model.transport.calls) - calls, 1)
+        self.assertEqual(self.model.conditions_stats["stations"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import random
+import time
+import unittest
+
+from locations import LocationRegistry
+from messages import MessageTable
+from spatial import intersects
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "locations.json")
+
+
+class LocationRegistryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # hundreds of overlapping regions, municipalities and contract areas
+        cls.registry = LocationRegistry.load(FIXTURE)
+
+
+    def brute_point(self, x, y):
+        return {name for name, box in self.registry.items()
+                if box[0] <= x <= box[2] and box[1] <= y <= box[3]}
+
+
+    def brute_bbox(self, bbox):
+        return {name for name, box in self.registry.items()
+                if intersects(box, bbox)}
+
+
+    def test_loads_every_location_in_order(self):
+        self.assertEqual(len(self.registry), 368)
+        self.assertEqual(self.registry.names()[0], "Region 0-0")
+        self.assertEqual(self.registry.kinds["Municipality 00-00"],
+                         "municipality")
+
+
+    def test_point_lookup_matches_a_full_scan(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            x, y = rng.uniform(19, 32), rng.uniform(59, 71)
+            self.assertEqual(set(self.registry.find_point(x, y)),
+                             self.brute_point(x, y))
+
+
+    def test_bbox_lookup_matches_a_full_scan(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            x, y = rng.uniform(19, 32), rng.uniform(59, 71)
+            bbox = (x, y, x + rng.uniform(0, 2), y + rng.uniform(0, 2))
+            found = self.registry.find_bbox(bbox)
+            self.assertEqual(len(found), len(set(found)))
+            self.assertEqual(set(found), self.brute_bbox(bbox))
+
+
+    def test_lookups_take_less_than_a_millisecond(self):
+        rng = random.Random(2)
+        boxes = []
+        for _ in range(1000):
+            x, y = rng.uniform(19, 32), rng.uniform(59, 71)
+            boxes.append((x, y, x + 0.5, y + 0.5))
+        start = time.perf_counter()
+        for bbox in boxes:
+            self.registry.find_bbox(bbox)
+        self.assertLess((time.perf_counter() - start) / len(boxes), 1e-3)
+
+
+    def test_bad_bbox_is_rejected(self):
+        with self.assertRaises(ValueError):
+            LocationRegistry([{"name": "Bad", "bbox": [25, 61, 24, 60]}])
+
+
+    def test_messages_are_found_by_their_locations(self):
+        table = MessageTable()
+        boxes = {
+            "point": (21.2, 60.2, 21.2, 60.2),
+            "area": (20.8, 59.8, 22.2, 60.8),
+            "far": (30.2, 69.2, 30.2, 69.2),
+        }
+        for situation_id, bbox in boxes.items():
+            table.append({"description": situation_id},
+                         self.registry.find_bbox(bbox), situation_id, 1)
+        table.append({"description": "unlocated"}, None, "unlocated", 1)
+
+        def found(location):
+            return [row["description"]
+                    for row in table.located_in(location)]
+
+        self.assertEqual(found("Municipality 01-01"),
+                         ["point", "area", "unlocated"])
+        self.assertEqual(found("Municipality 02-00"), ["area", "unlocated"])
+        self.assertEqual(found("Region 3-3"), ["far", "unlocated"])
+
+        # a new version moves the message, an expired one is gone
+        table.apply([("point", 2, {"description": "point"},
+                      self.registry.find_bbox(boxes["far"]))], ["area"])
+        self.assertEqual(found("Municipality 01-01"), ["unlocated"])
+        self.assertEqual(found("Region 3-3"), ["point", "far", "unlocated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import random
+import unittest
+
+# no display needed, the model is checked without a view
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QtWarningMsg, qInstallMessageHandler
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication
+
+from message_model import MessageTableModel
+from messages import MessageTable
+
+
+def message(situation_id, version):
+    return {
+        "countryCode": "FI",
+        "municipality": f"M{situation_id % 7}",
+        "road": situation_id % 50,
+        "description": f"{situation_id} v{version}",
+    }
+
+
+def sync(rng, base, next_id):
+    # expires, updates and adds random situations like a messages sync does
+    versions = base.versions()
+    removed = [situation_id for situation_id in versions
+               if rng.random() < 0.2]
+    upserts = [(situation_id, version + 1,
+                message(situation_id, version + 1), None)
+               for situation_id, version in versions.items()
+               if situation_id not in removed and rng.random() < 0.2]
+    for situation_id in range(next_id, next_id + rng.randrange(6)):
+        upserts.append((situation_id, 1, message(situation_id, 1),
+                        ("Kuopio",)))
+    table = base.copy()
+    changes = table.apply(upserts, removed)
+    changes.base = base
+    return changes, next_id + 6
+
+
+class MessageTableModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+
+    def setUp(self):
+        self.failures = []
+
+        def handler(kind, context, text):
+            if kind >= QtWarningMsg:
+                self.failures.append(text)
+
+        self.previous = qInstallMessageHandler(handler)
+
+
+    def tearDown(self):
+        qInstallMessageHandler(self.previous)
+
+
+    def rows(self, model):
+        return [[model.index(row, column).data()
+                 for column in range(model.columnCount())]
+                for row in range(model.rowCount())]
+
+
+    def test_apply_passes_the_model_tester(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            table = MessageTable()
+            for situation_id in range(30):
+                table.append(message(situation_id, 1), None, situation_id, 1)
+
+            model = MessageTableModel()
+            tester = QAbstractItemModelTester(
+                model, QAbstractItemModelTester.FailureReportingMode.Warning)
+            model.set_table(table)
+            next_id = 30
+            for _ in range(15):
+                changes, next_id = sync(rng, table, next_id)
+                model.apply(changes)
+                table = changes.table
+                self.assertEqual(self.rows(model),
+                                 [[str(row[name]) for name in table.COLUMNS]
+                                  for row in table])
+            self.assertEqual(self.failures, [], f"seed {seed}")
+            del tester
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import tempfile
+import unittest
+
+import requests
+
+from locations import LocationRegistry
+from tests.stub_transport import make_model
+
+
+MESSAGES = "/api/traffic-message/v1/messages"
+AREAS = "/api/traffic-message/v1/area-geometries/"
+
+ETAG = "ETag"
+LAST_MODIFIED = "Last-Modified"
+
+
+def message(situation_id, version, description, point=None, areas=()):
+    return {
+        "type": "Feature",
+        "geometry": None if point is None
+        else {"type": "Point", "coordinates": list(point)},
+        "properties": {
+            "situationId": situation_id,
+            "version": version,
+            "announcements": [{
+                "location": {"countryCode": "FI",
+                             "description": description},
+                "locationDetails": {"areaLocation": {"areas": [
+                    {"name": f"Area {code}", "locationCode": code}
+                    for code in areas]}} if areas else None,
+            }],
+        },
+    }
+
+
+def area(code, bbox):
+    x_min, y_min, x_max, y_max = bbox
+    return {"type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [[
+                [x_min, y_min], [x_max, y_min], [x_max, y_max],
+                [x_min, y_max], [x_min, y_min]]]},
+            "properties": {"locationCode": code}}
+
+
+# the geometries of the areas the messages are located by
+AREA_GEOMETRIES = {
+    "10": area(10, (24.8, 60.1, 25.0, 60.3)),
+    "20": area(20, (27.5, 62.8, 27.7, 63.0)),
+}
+
+
+def answer(features, etag, modified):
+    return ({"type": "FeatureCollection", "features": features}, 200,
+            {ETAG: etag, LAST_MODIFIED: modified})
+
+
+# the active messages list of every sync, in order
+SYNCS = [
+    answer([
+        message("A", 1, "A v1", (24.9, 60.2)),
+        message("B", 1, "B v1", (27.6, 62.9)),
+        message("C", 1, "C v1", (24.9, 60.2)),
+    ], '"1"', "Tue, 01 Nov 2022 10:00:00 GMT"),
+    answer([
+        # the same version with another text is not parsed again
+        message("A", 1, "A v1 again", (24.9, 60.2)),
+        message("B", 2, "B v2", (24.9, 60.2)),
+        message("D", 1, "D v1", (27.6, 62.9)),
+    ], '"2"', "Tue, 01 Nov 2022 10:01:00 GMT"),
+    (b"", 304, {}),
+]
+
+
+class MessagesSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.answers = list(SYNCS)
+        self.failing = set()
+        self.model = make_model(self.handle, self.home.name)
+        self.model.coordinates = LocationRegistry([
+            {"name": "Helsinki", "bbox": [24.5, 60, 25.5, 60.5]},
+            {"name": "Kuopio", "bbox": [27, 62.5, 28, 63.5]}])
+
+
+    def tearDown(self):
+        self.home.cleanup()
+
+
+    def handle(self, path, query, headers):
+        if path.startswith(AREAS):
+            code = path[len(AREAS):]
+            self.assertEqual(query["includeGeometry"], "True")
+            if code in self.failing:
+                return {"message": "Service unavailable"}, 503
+            return {"type": "FeatureCollection",
+                    "features": [AREA_GEOMETRIES[code]]}
+        self.assertEqual(path, MESSAGES)
+        self.assertEqual(query["includeAreaGeometry"], "False")
+        self.assertEqual(query["situationType"], "TRAFFIC_ANNOUNCEMENT")
+        return self.answers.pop(0)
+
+
+    def sync(self):
+        return self.model._sync_messages("TRAFFIC_ANNOUNCEMENT")
+
+
+    def rows(self, table):
+        return [(row["description"], table.locations(i))
+                for i, row in enumerate(table)]
+
+
+    def test_first_sync_inserts_every_situation(self):
+        changes = self.sync()
+
+        self.assertIsNone(changes.base)
+        self.assertEqual((changes.removed, changes.updated, changes.inserted),
+                         ([], [], [0, 1, 2]))
+        self.assertIs(self.model.message_store.get("TRAFFIC_ANNOUNCEMENT"),
+                      changes.table)
+        self.assertEqual(self.rows(changes.table), [
+            ("A v1", ("Helsinki",)),
+            ("B v1", ("Kuopio",)),
+            ("C v1", ("Helsinki",)),
+        ])
+        self.assertEqual(changes.table.versions(), {"A": 1, "B": 1, "C": 1})
+
+
+    def test_second_sync_skips_unchanged_versions_and_expires_missing(self):
+        first = self.sync().table
+        changes = self.sync()
+
+        # C expired, B got a new version and D is new
+        self.assertIs(changes.base, first)
+        self.assertEqual((changes.removed, changes.updated, changes.inserted),
+                         ([2], [1], [2]))
+        self.assertEqual(self.rows(changes.table), [
+            ("A v1", ("Helsinki",)),
+            ("B v2", ("Helsinki",)),
+            ("D v1", ("Kuopio",)),
+        ])
+        self.assertEqual(changes.table.versions(), {"A": 1, "B": 2, "D": 1})
+        self.assertEqual(self.rows(changes.table.located_in("Kuopio")),
+                         [("D v1", ("Kuopio",))])
+        self.assertIs(self.model.message_store.get("TRAFFIC_ANNOUNCEMENT"),
+                      changes.table)
+
+        # the table on screen is not changed by the sync
+        self.assertEqual([row["description"] for row in first],
+                         ["A v1", "B v1", "C v1"])
+
+
+    def test_not_modified_keeps_the_table(self):
+        self.sync()
+        second = self.sync().table
+        changes = self.sync()
+
+        self.assertFalse(changes)
+        self.assertIs(changes.base, second)
+        self.assertIs(changes.table, second)
+        self.assertIs(self.model.message_store.get("TRAFFIC_ANNOUNCEMENT"),
+                      second)
+        self.assertIs(self.model.message_changes["TRAFFIC_ANNOUNCEMENT"],
+                      changes)
+
+
+    def test_validators_of_the_last_answer_are_sent(self):
+        for _ in SYNCS:
+            self.sync()
+        headers = [headers for _, _, headers in self.model.transport.calls]
+
+        self.assertEqual(headers[0], {})
+        self.assertEqual(headers[1], {
+            "If-None-Match": '"1"',
+            "If-Modified-Since": "Tue, 01 Nov 2022 10:00:00 GMT"})
+        self.assertEqual(headers[2], {
+            "If-None-Match": '"2"',
+            "If-Modified-Since": "Tue, 01 Nov 2022 10:01:00 GMT"})
+
+
+    def area_calls(self):
+        return [path for path, _, _ in self.model.transport.calls
+                if path.startswith(AREAS)]
+
+
+    def test_area_messages_are_located_by_the_cached_areas(self):
+        self.answers = [
+            answer([
+                message("A", 1, "A v1", areas=[10]),
+                message("B", 1, "B v1", areas=[10, 20]),
+                message("C", 1, "C v1"),
+            ], '"1"', "Tue, 01 Nov 2022 10:00:00 GMT"),
+            answer([
+                message("A", 2, "A v2", areas=[10]),
+                message("B", 1, "B v1", areas=[10, 20]),
+                message("C", 1, "C v1"),
+            ], '"2"', "Tue, 01 Nov 2022 10:01:00 GMT"),
+        ]
+        first = self.sync().table
+        self.assertEqual(self.rows(first), [
+            ("A v1", ("Helsinki",)),
+            ("B v1", ("Helsinki", "Kuopio")),
+            # a message without a geometry or areas is in every location
+            ("C v1", None),
+        ])
+        self.assertEqual(sorted(self.area_calls()),
+                         [AREAS + "10", AREAS + "20"])
+
+        # the next version is located without fetching its area again
+        changes = self.sync()
+        self.assertEqual(changes.updated, [0])
+        self.assertEqual(self.rows(changes.table)[0], ("A v2", ("Helsinki",)))
+        self.assertEqual(len(self.area_calls()), 2)
+
+
+    def test_failing_area_fails_the_sync(self):
+        self.answers = [
+            answer([message("A", 1, "A v1", (24.9, 60.2))],
+                   '"1"', "Tue, 01 Nov 2022 10:00:00 GMT"),
+            answer([message("A", 1, "A v1", (24.9, 60.2)),
+                    message("B", 1, "B v1", areas=[20])],
+                   '"2"', "Tue, 01 Nov 2022 10:01:00 GMT"),
+            answer([message("A", 1, "A v1", (24.9, 60.2)),
+                    message("B", 1, "B v1", areas=[20])],
+                   '"2"', "Tue, 01 Nov 2022 10:01:00 GMT"),
+        ]
+        first = self.sync().table
+        self.failing = {"20"}
+        with self.assertRaises(requests.HTTPError):
+            self.sync()
+
+        # the previous table and validators are kept, the next sync retries
+        self.assertIs(self.model.message_store.get("TRAFFIC_ANNOUNCEMENT"),
+                      first)
+        self.failing = set()
+        changes = self.sync()
+        self.assertEqual(self.model.transport.calls[-2][2]["If-None-Match"],
+                         '"1"')
+        self.assertEqual(self.rows(changes.table),
+                         [("A v1", ("Helsinki",)), ("B v1", ("Kuopio",))])
+
+
+if __name__ == "__main__":
+    unittest.main()
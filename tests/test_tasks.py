@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+
+import numpy as np
+import requests
+
+from locations import LocationRegistry
+from tests.stub_transport import make_model
+
+
+ROUTES = "/api/maintenance/v1/tracking/routes"
+
+INPUTS = {
+    "start_time": "2022-11-01T00:00:00Z",
+    "end_time": "2022-11-04T00:00:00Z",
+    "location": "Test",
+}
+
+
+def route(route_id, end_time, tasks, bbox):
+    x_min, y_min, x_max, y_max = bbox
+    return {
+        "type": "Feature",
+        "geometry": {"type": "LineString",
+                     "coordinates": [[x_min, y_min], [x_max, y_max]]},
+        "properties": {"id": route_id, "endTime": end_time, "tasks": tasks},
+    }
+
+
+# the routes of every (day, tile) cell, the location spans half of both tiles
+CELLS = {
+    ("2022-11-01", 24): [
+        route(1, "2022-11-01T10:00:00Z", ["BRUSHING"], (24.8, 60.2, 24.9, 60.3)),
+        # outside the location, in the part of the tile that is not asked for
+        route(2, "2022-11-01T11:00:00Z", ["PAVING"], (24.1, 60.2, 24.2, 60.3)),
+        # across the tile edge, in the cells of both tiles
+        route(3, "2022-11-01T12:00:00Z", ["BRUSHING"], (24.9, 60.5, 25.1, 60.6)),
+    ],
+    ("2022-11-01", 25): [
+        route(3, "2022-11-01T12:00:00Z", ["BRUSHING"], (24.9, 60.5, 25.1, 60.6)),
+    ],
+    ("2022-11-02", 25): [
+        route(4, "2022-11-02T08:00:00Z", ["PLOUGHING", "SALTING"],
+              (25.2, 60.4, 25.3, 60.5)),
+    ],
+}
+
+
+class TasksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.failing = set()
+        self.model = make_model(self.handle, self.home.name)
+        self.model.coordinates = LocationRegistry([
+            {"name": "Test", "bbox": [24.5, 60, 25.5, 61]}])
+
+
+    def tearDown(self):
+        self.home.cleanup()
+
+
+    def handle(self, path, query, headers):
+        self.assertEqual(path, ROUTES)
+        cell = (query["endFrom"][:10], int(float(query["xMin"])))
+        if cell in self.failing:
+            return {"message": "Too many requests"}, 429
+        return {"type": "FeatureCollection", "features": CELLS.get(cell, [])}
+
+
+    def test_cells_are_merged_clipped_and_counted_once(self):
+        self.model.get_tasks_data(INPUTS)
+        histogram = self.model.tasks_histogram
+
+        # one request per day and tile
+        self.assertEqual(len(self.model.transport.calls), 3 * 2)
+        self.assertEqual(histogram.tasks, ["BRUSHING", "PLOUGHING", "SALTING"])
+        self.assertEqual(list(histogram.days), list(np.arange(
+            np.datetime64("2022-11-01"), np.datetime64("2022-11-04"))))
+        self.assertEqual(histogram.counts.tolist(),
+                         [[2, 0, 0], [0, 1, 0], [0, 1, 0]])
+
+
+    def test_failing_cell_fails_the_query(self):
+        self.failing = {("2022-11-02", 24)}
+        with self.assertRaises(requests.HTTPError):
+            self.model.get_tasks_data(INPUTS)
+
+        # the failed cell is not cached, the next query fetches it again
+        self.failing = set()
+        calls = len(self.model.transport.calls)
+        self.model.get_tasks_data(INPUTS)
+        cells = [(query["endFrom"][:10], query["xMin"])
+                 for _, query, _ in self.model.transport.calls[calls:]]
+        self.assertEqual(cells.count(("2022-11-02", "24")), 1)
+        self.assertEqual(self.model.tasks_histogram.counts.sum(), 4)
+
+
+    def test_failing_cell_is_reported_in_the_combined_report(self):
+        self.failing = {("2022-11-02", 24)}
+        self.model.get_messages_data = lambda inputs: None
+        self.model.get_conditions_data = lambda inputs: None
+        self.model.get_weather_data = lambda inputs: None
+        self.model.get_combined_data(INPUTS)
+
+        self.assertIn("429", self.model.errors["tasks"])
+        self.assertEqual(self.model.tasks_histogram.counts.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
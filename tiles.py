@@ -0,0 +1,60 @@
+import math
+
+
+def tile_bbox(tile, size=1):
+    """
+    Returns the (xMin, yMin, xMax, yMax) bounding box of the (ix, iy) tile.
+    """
+    ix, iy = tile
+    return (ix * size, iy * size, (ix + 1) * size, (iy + 1) * size)
+
+
+def tiles(bbox, size=1):
+    """
+    Returns the grid tiles that cover the bounding box.
+
+    The grid is fixed, tile (ix, iy) spans [ix * size, (ix + 1) * size] and
+    [iy * size, (iy + 1) * size], so overlapping boxes of different queries
+    are made of the same tiles and can share their cached data. A box edge
+    that lies on a grid line does not pull in the tile beyond it.
+
+    Parameters
+    ----------
+    bbox: tuple
+        The (xMin, yMin, xMax, yMax) bounding box.
+    size: int or float
+        The width and height of a tile in degrees.
+
+    Returns
+    -------
+    list
+        The list of (ix, iy) tiles.
+    """
+    x_min, y_min, x_max, y_max = bbox
+    ix_min = math.floor(x_min / size)
+    iy_min = math.floor(y_min / size)
+    ix_max = max(ix_min, math.ceil(x_max / size) - 1)
+    iy_max = max(iy_min, math.ceil(y_max / size) - 1)
+    return [
+        (ix, iy)
+        for ix in range(ix_min, ix_max + 1)
+        for iy in range(iy_min, iy_max + 1)
+    ]
+
+
+def covers(bbox, tile, size=1):
+    """
+    Returns True if the bounding box covers the whole tile.
+    """
+    t = tile_bbox(tile, size)
+    return bbox[0] <= t[0] and bbox[1] <= t[1] \
+        and t[2] <= bbox[2] and t[3] <= bbox[3]
+
+
+def clip(bbox, tile, size=1):
+    """
+    Returns the part of the bounding box inside the tile.
+    """
+    t = tile_bbox(tile, size)
+    return (max(bbox[0], t[0]), max(bbox[1], t[1]),
+            min(bbox[2], t[2]), min(bbox[3], t[3]))
@@ -0,0 +1,93 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport:
+    """
+    Transport class for sending HTTP requests to the data APIs.
+
+    This class keeps one pooled keep-alive requests.Session per host, so
+    consecutive queries to the same API reuse already open TCP/TLS connections
+    instead of doing a new DNS lookup and handshake on every request.
+
+    Attributes
+    ----------
+    hosts: tuple
+        The base URLs (scheme://host) of the APIs that are warmed on startup.
+    pool_size: int
+        The max number of kept-alive connections per host.
+    timeout: tuple
+        The (connect, read) timeouts in seconds for every request.
+    headers: dict
+        The default headers sent with every request.
+
+    Methods
+    -------
+    get(url, params=None, stream=False, headers=None)
+        Sends a GET request using the pooled session of the url's host.
+    warm()
+        Opens the connections to all the hosts in a background thread.
+    close()
+        Closes all the sessions and their pooled connections.
+    """
+
+    def __init__(self, hosts=(), pool_size=4, timeout=(3.05, 30)):
+        self.hosts = tuple(hosts)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {
+            "Accept-Encoding": "gzip, deflate",
+            # digitraffic asks the clients to identify themselves
+            "Digitraffic-User": "Traffico",
+        }
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+
+    def _session(self, url):
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}"
+        # sessions are shared between threads, so create them only once
+        with self._lock:
+            session = self._sessions.get(base)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.pool_size)
+                session.mount(base, adapter)
+                self._sessions[base] = session
+        return session
+
+
+    def get(self, url, params=None, stream=False, headers=None):
+        # extra headers are merged over the session defaults per request
+        return self._session(url).get(url=url,
+                                      params=params,
+                                      stream=stream,
+                                      headers=headers,
+                                      timeout=self.timeout)
+
+
+    def warm(self):
+        def _warm():
+            for host in self.hosts:
+                try:
+                    self._session(host).head(host, timeout=self.timeout)
+                except requests.RequestException:
+                    # warming is best effort, the real request will retry
+                    pass
+
+        thread = threading.Thread(target=_warm, daemon=True)
+        thread.start()
+        return thread
+
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
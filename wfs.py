@@ -0,0 +1,137 @@
+import math
+import xml.etree.ElementTree as ET
+from array import array
+
+
+# namespaces of the FMI simple feature responses
+BSWFS = "{http://xml.fmi.fi/schema/wfs/2.0}"
+GML = "{http://www.opengis.net/gml/3.2}"
+
+
+def iter_observations(chunks):
+    """
+    Yields the observations of an FMI simple feature WFS response.
+
+    The response is parsed incrementally with an XMLPullParser and the members
+    are removed from the tree after they are read, so the memory use does not
+    grow with the length of the time range.
+
+    Parameters
+    ----------
+    chunks: iterable
+        The iterable of bytes chunks of the response body.
+
+    Yields
+    ------
+    tuple
+        The (station, time, parameter, value) of every observation, where the
+        station is the "lat lon" position string and missing values are NaN.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_events(parser, root)
+    parser.close()
+    yield from _read_events(parser, root)
+
+
+def _read_events(parser, root):
+    for event, elem in parser.read_events():
+        if event == "start":
+            if not root:
+                root.append(elem)
+            continue
+        if elem.tag != BSWFS + "BsWfsElement":
+            continue
+
+        station = elem.findtext(f"{BSWFS}Location/{GML}Point/{GML}pos", "")
+        time = elem.findtext(BSWFS + "Time")
+        name = elem.findtext(BSWFS + "ParameterName")
+        try:
+            value = float(elem.findtext(BSWFS + "ParameterValue"))
+        except (TypeError, ValueError):
+            value = math.nan
+        # drop the members read so far, the tree stays one member deep
+        root[0].clear()
+        yield station.strip(), time, name, value
+
+
+def parse_series(chunks):
+    """
+    Returns the observations of a WFS response as time series.
+
+    Parameters
+    ----------
+    chunks: iterable
+        The iterable of bytes chunks of the response body.
+
+    Returns
+    -------
+    dict
+        The dict of stations, each a dict of parameters, each a dict with the
+        "time" list of timestamps and the "value" array of floats.
+    """
+    series = {}
+    for station, time, name, value in iter_observations(chunks):
+        params = series.setdefault(station, {})
+        if name not in params:
+            params[name] = {"time": [], "value": array("d")}
+        params[name]["time"].append(time)
+        params[name]["value"].append(value)
+    return series
+
+
+def series_size(series):
+    """
+    Returns the approximate size in bytes of the time series.
+    """
+    # 8 bytes per float and about 20 per ISO timestamp
+    return sum(
+        28 * len(ts["value"])
+        for params in series.values()
+        for ts in params.values()
+    )
+
+
+def aggregate(series, names):
+    """
+    Returns the min/mean/max/latest of every parameter over all stations.
+
+    Parameters
+    ----------
+    series: dict
+        The time series returned by parse_series.
+    names: iterable
+        The parameter names to aggregate.
+
+    Returns
+    -------
+    dict
+        The dict of parameters, each a dict of "min", "mean", "max" and
+        "latest" (mean of the last value of every station), or None values if
+        there are no observations.
+    """
+    stats = {}
+    for name in names:
+        values = []
+        latest = []
+        for params in series.values():
+            ts = params.get(name)
+            if ts is None:
+                continue
+            valid = [v for v in ts["value"] if not math.isnan(v)]
+            values.extend(valid)
+            if valid:
+                latest.append(valid[-1])
+
+        if values:
+            stats[name] = {
+                "min": min(values),
+                "mean": round(sum(values) / len(values), 1),
+                "max": max(values),
+                "latest": round(sum(latest) / len(latest), 1),
+            }
+        else:
+            stats[name] = dict.fromkeys(("min", "mean", "max", "latest"))
+    return stats
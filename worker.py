@@ -0,0 +1,65 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+
+class WorkerSignals(QObject):
+    """
+    WorkerSignals class for sending the Worker results to the GUI thread.
+
+    QRunnable is not a QObject, so the signals live in this helper object
+    which is created in the GUI thread. Signals emitted from the pool thread
+    are therefore queued and their slots run in the GUI thread.
+
+    Attributes
+    ----------
+    result: PyQt5.QtCore.pyqtSignal
+        Emitted with the return value of the function on success.
+    error: PyQt5.QtCore.pyqtSignal
+        Emitted with the error message if the function raised.
+    finished: PyQt5.QtCore.pyqtSignal
+        Emitted last, whether the function succeeded or not.
+    """
+
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Worker class for running blocking Model queries in a QThreadPool.
+
+    Attributes
+    ----------
+    func: callable
+        The function to run in the background thread.
+    args: tuple
+        The positional arguments of the function.
+    kwargs: dict
+        The keyword arguments of the function.
+    signals: worker.WorkerSignals
+        The signals for sending the result back to the GUI thread.
+
+    Methods
+    -------
+    run()
+        Runs the function and emits its result or error.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()